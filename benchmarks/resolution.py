@@ -0,0 +1,250 @@
+"""Accuracy versus cost of the curve resolution and of the on-curve tolerance
+
+Run from the top-level directory with `python -m benchmarks.resolution`.
+
+The resolution sweep times `PhaseDiagram.curves` for each `number_of_points` and measures:
+
+* the maximum deviation of each curve from a high resolution one, in decades of pressure (|log10(P / P_ref)|),
+  interpolating linearly in (T, log P) as the curves are drawn in the log-scaled plots;
+* the relative deviation from the tabulated boiling point (Antoine curve), melting point (Clapeyron S-L curve) and
+  critical point (Antoine curve) of the interpolated curves. These include the model error, which does not depend on
+  the resolution, so they converge to a floor instead of zero.
+
+The same measures are taken for adaptive sampling (`sampling_tolerance`), reporting the mean number of points per
+curve instead of a fixed `number_of_points`.
+
+The tolerance sweep times `PhaseDiagram.physical_state` for points on the curves, rounded to a number of significant
+digits as tabulated data is, and for points displaced from the curves by a small relative offset, and measures the
+fraction of misclassified points (on-curve points not detected plus off-curve points detected as on a curve).
+"""
+import argparse
+import time
+
+import numpy as np
+
+from phase_diagram.phase_diagram import PhaseDiagram
+from src.helpers import full_data_compounds, d
+
+RESOLUTIONS = (10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+TOLERANCES = ((1e-3, 0), (1e-6, 0), (1, 0), (0, 1e-9), (0, 1e-7), (0, 1e-6), (0, 1e-5))
+SAMPLING_TOLERANCES = (0.1, 0.05, 0.01, 0.005, 0.001)
+REFERENCE_POINTS = 20001
+
+
+def diagrams(**kwargs):
+    """PhaseDiagram objects for every compound with full data"""
+    compounds = d['compounds'].set_index('id')
+    return [PhaseDiagram(compounds.loc[idx, 'cas'], **kwargs) for idx in full_data_compounds()]
+
+
+def _log_interp(T, curve):
+    """Pressures at temperatures T interpolated linearly in (T, log P) along a curve"""
+    T_arr, P_arr = (curve[0].to('K').magnitude, curve[1].to('Pa').magnitude)
+    order = np.argsort(T_arr)
+    return 10**np.interp(T, T_arr[order], np.log10(P_arr[order]))
+
+
+def _curve_deviation(curve, reference):
+    """Maximum deviation in decades of pressure of a curve from a reference curve, over their common range"""
+    T_ref, P_ref = reference[0].to('K').magnitude, reference[1].to('Pa').magnitude
+    T_arr = curve[0].to('K').magnitude
+    mask = (T_ref >= T_arr.min()) & (T_ref <= T_arr.max())
+    return np.max(np.abs(np.log10(_log_interp(T_ref[mask], curve) / P_ref[mask])))
+
+
+def _table_deviations(diagram, curves):
+    """Relative deviations from the tabulated boiling, melting and critical points"""
+    boiling = diagram.boiling_point
+    P_boiling = _log_interp(boiling.temperature.to('K').magnitude, curves['antoine_lv'])
+    critical = diagram.critical_point
+    P_critical = _log_interp(critical.temperature.to('K').magnitude, curves['antoine_lv'])
+    melting = diagram.melting_point
+    T_sl, P_sl = curves['clapeyron_sl'][0].to('K').magnitude, curves['clapeyron_sl'][1].to('Pa').magnitude
+    order = np.argsort(P_sl)
+    T_melting = np.interp(melting.pressure.to('Pa').magnitude, P_sl[order], T_sl[order])
+    return {'boiling_point': abs(P_boiling / boiling.pressure.to('Pa').magnitude - 1),
+            'melting_point': abs(T_melting / melting.temperature.to('K').magnitude - 1),
+            'critical_point': abs(P_critical / critical.pressure.to('Pa').magnitude - 1)}
+
+
+def _timed(function, repeat):
+    """Median runtime of a function call in seconds and its last result"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return np.median(times), result
+
+
+def _references(compounds):
+    references = {}
+    for diagram in compounds:
+        diagram.number_of_points = REFERENCE_POINTS
+        diagram.sampling_tolerance = None
+        references[diagram.cas] = diagram.curves()
+    return references
+
+
+def _deviation_row(row, compounds, references, repeat):
+    """Adds runtime, points and deviations of the current settings of the compounds to a result row"""
+    row.update({'runtime': 0, 'points': 0, 'clapeyron_sl': 0, 'clapeyron_sv': 0, 'antoine_lv': 0,
+                'boiling_point': 0, 'melting_point': 0, 'critical_point': 0})
+    for diagram in compounds:
+        runtime, curves = _timed(diagram.curves, repeat)
+        row['runtime'] += runtime
+        for name, curve in curves.items():
+            row['points'] += len(curve[0]) / (len(curves) * len(compounds))
+            row[name] = max(row[name], _curve_deviation(curve, references[diagram.cas][name]))
+        for name, deviation in _table_deviations(diagram, curves).items():
+            row[name] = max(row[name], deviation)
+    return row
+
+
+def resolution_sweep(resolutions=RESOLUTIONS, repeat=5):
+    """
+    Runtime and deviations for each curve resolution
+
+    Returns
+    -------
+    list
+        one dict per resolution with the runtime in seconds (summed over compounds), the mean number of points per
+        curve and the maximum deviations over compounds
+    """
+    compounds = diagrams()
+    references = _references(compounds)
+    results = []
+    for number_of_points in resolutions:
+        for diagram in compounds:
+            diagram.number_of_points = number_of_points
+        results.append(_deviation_row({'number_of_points': number_of_points}, compounds, references, repeat))
+    return results
+
+
+def sampling_sweep(sampling_tolerances=SAMPLING_TOLERANCES, repeat=5):
+    """
+    Runtime and deviations for each adaptive sampling tolerance
+
+    Returns
+    -------
+    list
+        same as `resolution_sweep`, with `sampling_tolerance` instead of `number_of_points`
+    """
+    compounds = diagrams()
+    references = _references(compounds)
+    results = []
+    for sampling_tolerance in sampling_tolerances:
+        for diagram in compounds:
+            diagram.sampling_tolerance = sampling_tolerance
+        results.append(_deviation_row({'sampling_tolerance': sampling_tolerance}, compounds, references, repeat))
+    return results
+
+
+def _test_points(diagram, points, digits, offset, rng):
+    """Points on the curves rounded to `digits` significant digits and points displaced by `offset`"""
+    Q_ = diagram.ureg.Quantity
+    T_triple = diagram.triple_point.temperature.to('K').magnitude
+    T_critical = diagram.critical_point.temperature.to('K').magnitude
+    functions = ((diagram._antoine_lv, T_triple, T_critical),
+                 (diagram._clapeyron_sl, T_triple - 1, T_triple + 1),
+                 (lambda T: diagram._clapeyron_sv_lv(T, curve='sv'), T_triple - 60, T_triple))
+    on_curve, off_curve = [], []
+    for function, T_min, T_max in functions:
+        T_arr = rng.uniform(max(T_min, 1), T_max, points)
+        P_arr = function(Q_(T_arr, 'K')).to('Pa').magnitude
+        P_rounded = np.char.mod(f'%.{digits}g', P_arr).astype(float)
+        on_curve += [(Q_(T, 'K'), Q_(P, 'Pa')) for T, P in zip(T_arr, P_rounded)]
+        off_curve += [(Q_(T, 'K'), Q_(P * (1 + offset), 'Pa')) for T, P in zip(T_arr, P_arr)]
+    return on_curve, off_curve
+
+
+def tolerance_sweep(tolerances=TOLERANCES, points=10, digits=6, offset=1e-4, seed=0):
+    """
+    Runtime and misclassification rate for each (absolute, relative) tolerance pair
+
+    Returns
+    -------
+    list
+        one dict per tolerance pair with the runtime in seconds (summed over compounds) and the misclassified
+        fraction of the points
+    """
+    rng = np.random.default_rng(seed)
+    compounds = diagrams()
+    test_points = {diagram.cas: _test_points(diagram, points, digits, offset, rng) for diagram in compounds}
+
+    results = []
+    for tolerance, relative_tolerance in tolerances:
+        row = {'tolerance': tolerance, 'relative_tolerance': relative_tolerance, 'runtime': 0, 'error': 0}
+        misclassified, total = 0, 0
+        for diagram in compounds:
+            diagram.tolerance = tolerance
+            diagram.relative_tolerance = relative_tolerance
+            on_curve, off_curve = test_points[diagram.cas]
+            start = time.perf_counter()
+            on_states = [diagram.physical_state(point) for point in on_curve]
+            off_states = [diagram.physical_state(point) for point in off_curve]
+            row['runtime'] += time.perf_counter() - start
+            misclassified += sum(not state.endswith('curve') for state in on_states)
+            misclassified += sum(state.endswith('curve') for state in off_states)
+            total += len(on_states) + len(off_states)
+        row['error'] = misclassified / total
+        results.append(row)
+    return results
+
+
+def cheapest(results, error_keys, target):
+    """The fastest result whose errors are all below the target, or None"""
+    valid = [row for row in results if all(row[key] <= target for key in error_keys)]
+    return min(valid, key=lambda row: row['runtime']) if valid else None
+
+
+def _print_table(results):
+    keys = list(results[0])
+    print(' '.join(f'{key:>16}' for key in keys))
+    for row in results:
+        print(' '.join(f'{row[key]:>16.4g}' for key in keys))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--target-curve-error', type=float, default=0.01,
+                        help='maximum deviation from the high resolution curves, in decades of pressure')
+    parser.add_argument('--target-misclassification', type=float, default=0.0,
+                        help='maximum fraction of misclassified on/off-curve points')
+    parser.add_argument('--repeat', type=int, default=5, help='repetitions of each timing')
+    parser.add_argument('--points', type=int, default=10, help='test points per curve and compound')
+    parser.add_argument('--digits', type=int, default=6, help='significant digits of the on-curve points')
+    parser.add_argument('--offset', type=float, default=1e-4, help='relative offset of the off-curve points')
+    args = parser.parse_args()
+
+    print(f'Compounds with full data: {len(full_data_compounds())}\n')
+
+    print('Curve resolution')
+    resolution = resolution_sweep(repeat=args.repeat)
+    _print_table(resolution)
+    for curves in (['clapeyron_sl'], ['clapeyron_sv'], ['antoine_lv'], ['clapeyron_sl', 'clapeyron_sv', 'antoine_lv']):
+        best = cheapest(resolution, curves, args.target_curve_error)
+        print(f'Cheapest number_of_points for {", ".join(curves)} error <= {args.target_curve_error:g} decades: '
+              f'{best["number_of_points"] if best else "none"}')
+    print()
+
+    print('Adaptive curve sampling')
+    sampling = sampling_sweep(repeat=args.repeat)
+    _print_table(sampling)
+    best = cheapest(sampling, ['clapeyron_sl', 'clapeyron_sv', 'antoine_lv'], args.target_curve_error)
+    print(f'Cheapest sampling_tolerance for curve errors <= {args.target_curve_error:g} decades: '
+          f'{best["sampling_tolerance"] if best else "none"}\n')
+
+    print('On-curve tolerance')
+    tolerance = tolerance_sweep(points=args.points, digits=args.digits, offset=args.offset)
+    _print_table(tolerance)
+    best = cheapest(tolerance, ['error'], args.target_misclassification)
+    if best:
+        print(f'Cheapest tolerances for misclassification <= {args.target_misclassification:g}: '
+              f'tolerance={best["tolerance"]:g}, relative_tolerance={best["relative_tolerance"]:g}')
+    else:
+        print(f'No tolerance reaches misclassification <= {args.target_misclassification:g}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Throughput of concurrent physical state queries in a thread pool
+
+Run from the top-level directory with `python -m benchmarks.threads`.
+
+Random (temperature, pressure) points of every compound with full data are classified with `src.si.physical_state`
+by thread pools of increasing size. Each task classifies one chunk of points. Small chunks spend most of the time in
+Python code holding the GIL and do not scale; large chunks spend most of the time in NumPy loops that release it.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src import si
+from src.helpers import full_data_compounds, d
+
+
+def tasks(total_points, chunk_size, seed=0):
+    """(Parameters, temperatures, pressures) chunks spread over every compound with full data"""
+    rng = np.random.default_rng(seed)
+    compounds = d['compounds'].set_index('id')
+    params = [si.compound_parameters(compounds.loc[idx, 'cas']) for idx in full_data_compounds()]
+    chunks = []
+    for i in range(max(1, total_points // chunk_size)):
+        p = params[i % len(params)]
+        T = rng.uniform(max(p.triple_temperature - 60, 1), p.critical_temperature + 100, chunk_size)
+        P = 10**rng.uniform(-5, 9, chunk_size)
+        chunks.append((p, T, P))
+    return chunks
+
+
+def throughput(chunks, workers, repeat=3):
+    """Best throughput, in points per second, of classifying all chunks with a thread pool"""
+    points = sum(len(T) for p, T, P in chunks)
+    best = np.inf
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            list(executor.map(lambda chunk: si.state_codes(*chunk), chunks))
+            best = min(best, time.perf_counter() - start)
+    return points / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--points', type=int, default=2_000_000, help='total number of points')
+    parser.add_argument('--chunks', type=int, nargs='+', default=[100, 10_000, 200_000], help='points per task')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8], help='thread pool sizes')
+    parser.add_argument('--repeat', type=int, default=3, help='repetitions of each timing')
+    args = parser.parse_args()
+
+    print(f'CPUs: {os.cpu_count()}, points: {args.points}\n')
+    print(f'{"chunk":>10} {"workers":>8} {"points/s":>12} {"speedup":>8}')
+    for chunk_size in args.chunks:
+        chunks = tasks(args.points, chunk_size)
+        baseline = None
+        for workers in args.workers:
+            rate = throughput(chunks, workers, args.repeat)
+            baseline = baseline or rate
+            print(f'{chunk_size:>10} {workers:>8} {rate:>12.3g} {rate / baseline:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
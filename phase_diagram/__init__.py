@@ -1,4 +1,10 @@
+import threading
+
 from pint import UnitRegistry
 ureg = UnitRegistry()
 Q_ = ureg.Quantity
 ureg.setup_matplotlib(True)
+
+# pint registries cache parsed units and conversion factors and are not safe for concurrent use.
+# Code that may run in threads must hold this lock while using the registry (see src/si.py)
+registry_lock = threading.RLock()
@@ -4,50 +4,168 @@ import numpy as np
 from scipy import constants
 
 from src.helpers import compound_index, compound_identification, compound_names, density_table, density, \
-    antoine, point, enthalpy, volume_change_fusion
+    antoine, point, enthalpy, volume_change_fusion, pinned_database
 from src.plot import Plot
 from src.point_in_curve import point_in_function
-from . import ureg
+from src.sampling import adaptive_temperatures
+from . import ureg, Q_
 import re
 from collections import namedtuple
+import matplotlib
 import matplotlib.pyplot as plt
+from matplotlib.lines import Line2D
 
 
 gas_constant = constants.gas_constant * ureg.J/(ureg.mol*ureg.K)
 
+_Antoine = namedtuple("antoine", ["Tmin", "Tmax", "A", "B", "C"])
+_Point = namedtuple("point", ["temperature", "pressure"])
+_AntoineSI = namedtuple("antoine_si", ["Tmin", "Tmax", "A", "B", "C"])
+_ConsistentPoint = namedtuple("consistent_point", ["temperature", "pressure", "found"])
+# SI units of the quantities rebuilt in `from_parameters`, the ones `src.si.parameters` reads them in, parsed once
+_units = {name: ureg.Unit(name) for name in ('kg/mol', 'kg/m**3', 'kelvin', 'pascal', 'J/mol', 'm**3/mol')}
+
 
 class PhaseDiagram:
-    def __init__(self, compound):
+    def __init__(self, compound, number_of_points=100, tolerance=0.001, relative_tolerance=0, sampling_tolerance=None):
         """
         Instantiates a PhaseDiagram object
         Parameters
         ----------
         compound : str
             compound name, formula or CAS
+        number_of_points : int, default=100
+            number of points of each curve
+        tolerance : float, default=0.001
+            absolute pressure tolerance used to decide if a point is on a curve in `physical_state`
+        relative_tolerance : float, default=0
+            tolerance relative to the curve pressure, added to the absolute one
+        sampling_tolerance : float, optional
+            if given, curves are sampled adaptively instead of with `number_of_points` evenly spaced temperatures, with
+            the fewest points that keep straight segments within this number of decades of pressure from the curve
+        """
+        with pinned_database():
+            self.compound = compound
+            self.idx = compound_index(self.compound)
+            self.cas = compound_identification(self.compound).cas
+            self.formula = compound_identification(self.compound).formula
+            self.molar_mass = compound_identification(self.compound).molar_mass * ureg('gram/mole')
+            self.name = compound_names(self.compound).name
+            self.alternative_names = (compound_names(self.compound).alt_name1,
+                                      compound_names(self.compound).alt_name2,
+                                      compound_names(self.compound).alt_name3)
+            self.density_solid = density(self.compound, 'solid')
+            self.density_liquid = density(self.compound, 'liquid')
+            self.antoine = antoine(self.compound)
+            self.boiling_point = point(self.compound, 'boiling_point')
+            self.melting_point = point(self.compound, 'melting_point')
+            self.triple_point = point(self.compound, 'triple_point')
+            self.critical_point = point(self.compound, 'critical_point')
+            self.enthalpy_fusion = enthalpy(self.compound, 'fusion')
+            self.enthalpy_sublimation = enthalpy(self.compound, 'sublimation')
+            self.enthalpy_vaporization = enthalpy(self.compound, 'vaporization')
+            self.volume_change_fusion = volume_change_fusion(self.compound)
+            self.density_table = density_table(self.compound)
+        self._antoine_si = None
+        self.ureg = ureg
+        self.number_of_points = number_of_points
+        self.tolerance = tolerance
+        self.relative_tolerance = relative_tolerance
+        self.sampling_tolerance = sampling_tolerance
+
+    @classmethod
+    def from_parameters(cls, params, idx, name, formula, cas, alternative_names=(None, None, None), compound=None,
+                        antoine=None, number_of_points=100, tolerance=0.001, relative_tolerance=0,
+                        sampling_tolerance=None):
+        """
+        Instantiates a PhaseDiagram object from SI magnitudes, without reading the database
+
+        Parameters
+        ----------
+        params : namedtuple
+            numeric data with the fields of `src.si.Parameters`, in SI units
+        idx : int
+            compound index in the database
+        name : str
+            compound name
+        formula : str
+            compound formula
+        cas : str
+            compound CAS
+        alternative_names : tuple, default=(None, None, None)
+            compound alternative names
+        compound : str, optional
+            identifier the object was created with, `name` if not given
+        antoine : tuple, optional
+            (Tmin, Tmax, A, B, C) as in the database, in Celsius and mmHg, kept as the `antoine` attribute. If not
+            given, computed from `params`. The curves always use the Antoine fields of `params`
+        Other parameters are the same of `PhaseDiagram`.
+
+        Quantities keep the SI units of `params`, so `src.si.parameters` of the result is exactly `params`. The
+        `density_table` attribute is None, as no database table is read.
         """
-        self.compound = compound
-        self.idx = compound_index(self.compound)
-        self.cas = compound_identification(self.compound).cas
-        self.formula = compound_identification(self.compound).formula
-        self.molar_mass = compound_identification(self.compound).molar_mass * ureg('gram/mole')
-        self.name = compound_names(self.compound).name
-        self.alternative_names = (compound_names(self.compound).alt_name1,
-                                  compound_names(self.compound).alt_name2,
-                                  compound_names(self.compound).alt_name3)
-        self.density_solid = density(self.compound, 'solid')
-        self.density_liquid = density(self.compound, 'liquid')
-        self.antoine = antoine(self.compound)
-        self.boiling_point = point(self.compound, 'boiling_point')
-        self.melting_point = point(self.compound, 'melting_point')
-        self.triple_point = point(self.compound, 'triple_point')
-        self.critical_point = point(self.compound, 'critical_point')
-        self.enthalpy_fusion = enthalpy(self.compound, 'fusion')
-        self.enthalpy_sublimation = enthalpy(self.compound, 'sublimation')
-        self.enthalpy_vaporization = enthalpy(self.compound, 'vaporization')
-        self.volume_change_fusion = volume_change_fusion(self.compound)
-        self.density_table = density_table(self.compound)
+        self = cls.__new__(cls)
+        self.compound = name if compound is None else compound
+        self.idx = idx
+        self.cas = cas
+        self.formula = formula
+        self.molar_mass = Q_(params.molar_mass, _units['kg/mol'])
+        self.name = name
+        self.alternative_names = tuple(alternative_names)
+        self.density_solid = Q_(params.density_solid, _units['kg/m**3'])
+        self.density_liquid = Q_(params.density_liquid, _units['kg/m**3'])
+        if antoine is None:
+            antoine = (params.antoine_Tmin - 273.15, params.antoine_Tmax - 273.15,
+                       float(params.antoine_A - np.log10(101325/760)), params.antoine_B, params.antoine_C + 273.15)
+        self.antoine = _Antoine(*antoine)
+        self._antoine_si = _AntoineSI(params.antoine_Tmin, params.antoine_Tmax, params.antoine_A, params.antoine_B,
+                                      params.antoine_C)
+        for point_name in ('boiling', 'melting', 'triple', 'critical'):
+            temperature = Q_(getattr(params, f'{point_name}_temperature'), _units['kelvin'])
+            pressure = Q_(getattr(params, f'{point_name}_pressure'), _units['pascal'])
+            setattr(self, f'{point_name}_point', _Point(temperature, pressure))
+        for enthalpy_name in ('fusion', 'sublimation', 'vaporization'):
+            setattr(self, f'enthalpy_{enthalpy_name}',
+                    Q_(getattr(params, f'enthalpy_{enthalpy_name}'), _units['J/mol']))
+        self.volume_change_fusion = Q_(params.volume_change_fusion, _units['m**3/mol'])
+        self.density_table = None
         self.ureg = ureg
-        self.number_of_points = 100
+        self.number_of_points = number_of_points
+        self.tolerance = tolerance
+        self.relative_tolerance = relative_tolerance
+        self.sampling_tolerance = sampling_tolerance
+        return self
+
+    def to_bytes(self):
+        """
+        Compact serialization with SI magnitudes and a schema version, see `src.serialization`. The density table is
+        not included
+
+        Returns
+        -------
+        bytes
+        """
+        from src.serialization import dumps
+        return dumps(self)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Instantiates a PhaseDiagram object serialized with `to_bytes`, binding units to this process registry
+
+        Parameters
+        ----------
+        data : bytes
+
+        Returns
+        -------
+        PhaseDiagram
+        """
+        from src.serialization import loads
+        return loads(data, cls=cls)
+
+    def __reduce__(self):
+        return self.__class__.from_bytes, (self.to_bytes(),)
 
     def __repr__(self):
         return f'{self.__class__.__name__}(name= {self.name}, CAS= {self.cas}, formula= {self.formula})'
@@ -71,6 +189,13 @@ class PhaseDiagram:
         right_side = A - (B / (C + temperature.magnitude))
         return 10**right_side * ureg.Pa
 
+    def _temperatures(self, start, stop, function):
+        """Evenly spaced temperatures between start and stop (K), or adaptive ones if `sampling_tolerance` is set"""
+        if self.sampling_tolerance is None:
+            return np.linspace(start, stop, self.number_of_points) * ureg.kelvin
+        return adaptive_temperatures(lambda T: function(T * ureg.kelvin).to('Pa').magnitude, start, stop,
+                                     tolerance=self.sampling_tolerance) * ureg.kelvin
+
     def clapeyron_sl(self, temp_range=5):
         """Clausius-Clapeyron solid-liquid line data
 
@@ -87,9 +212,9 @@ class PhaseDiagram:
         if self.volume_change_fusion > 0:
             temp_range = -temp_range
 
-        T_arr = np.linspace(self.triple_point.temperature.magnitude,
-                            self.triple_point.temperature.magnitude-temp_range,
-                            self.number_of_points) * ureg.kelvin
+        T_arr = self._temperatures(self.triple_point.temperature.magnitude,
+                                   self.triple_point.temperature.magnitude-temp_range,
+                                   self._clapeyron_sl)
         P_arr = self._clapeyron_sl(T_arr)
         return T_arr, P_arr
 
@@ -107,9 +232,9 @@ class PhaseDiagram:
         """
         if self.triple_point.temperature.magnitude - temp_range < 0:
             temp_range = int(abs(self.triple_point.temperature.magnitude - temp_range))
-        T_arr = np.linspace(self.triple_point.temperature.magnitude - temp_range,
-                            self.triple_point.temperature.magnitude,
-                            self.number_of_points) * ureg.K
+        T_arr = self._temperatures(self.triple_point.temperature.magnitude - temp_range,
+                                   self.triple_point.temperature.magnitude,
+                                   partial(self._clapeyron_sv_lv, curve='sv'))
         P_arr = self._clapeyron_sv_lv(T_arr, curve='sv')
         return T_arr, P_arr
 
@@ -121,9 +246,9 @@ class PhaseDiagram:
         tuple
             Tuple of arrays (temperature, pressure)
         """
-        T_arr = np.linspace(self.triple_point.temperature.magnitude,
-                            self.critical_point.temperature.magnitude,
-                            self.number_of_points) * ureg.kelvin
+        T_arr = self._temperatures(self.triple_point.temperature.magnitude,
+                                   self.critical_point.temperature.magnitude,
+                                   partial(self._clapeyron_sv_lv, curve='lv'))
         P_arr = self._clapeyron_sv_lv(T_arr, curve='lv')
         return T_arr, P_arr
 
@@ -136,13 +261,14 @@ class PhaseDiagram:
         tuple
             Minimum and maximum temperature for A, B and C in SI units.
         """
+        if self._antoine_si is not None:
+            return self._antoine_si
         Tmin = self.antoine.Tmin + 273.15
         Tmax = self.antoine.Tmax + 273.15
         A = self.antoine.A + np.log10(101325/760)
         B = self.antoine.B
         C = self.antoine.C - 273.15
-        Antoine = namedtuple("antoine_si", ["Tmin", "Tmax", "A", "B", "C"])
-        return Antoine(Tmin, Tmax, A, B, C)
+        return _AntoineSI(Tmin, Tmax, A, B, C)
 
     def antoine_lv(self):
         """Antoine liquid-vapor line data
@@ -151,13 +277,59 @@ class PhaseDiagram:
         tuple
             temperature array, pressure array
         """
-        T_arr = np.linspace(self.triple_point.temperature.magnitude,
-                            self.critical_point.temperature.magnitude, self.number_of_points) * ureg.K
+        T_arr = self._temperatures(self.triple_point.temperature.magnitude,
+                                   self.critical_point.temperature.magnitude, self._antoine_lv)
 
         P_arr = self._antoine_lv(T_arr)
 
         return T_arr, P_arr
 
+    def consistent_triple_point(self, max_shift=5.0):
+        """Triple point where the Antoine liquid-vapour and Clapeyron solid-vapour curves meet, see
+        `src.intersections`
+
+        Parameters
+        ----------
+        max_shift : float, default=5.0
+            maximum distance in kelvin from the tabulated triple point temperature
+
+        Returns
+        -------
+        tuple
+            temperature, pressure and if the intersection was found. If the curves do not cross inside the Antoine
+            validity range within `max_shift` of the tabulated triple point, the tabulated one is returned
+        """
+        from src import si
+        from src.intersections import intersections
+        T, P = intersections(si.parameters(self), max_shift=max_shift).clapeyron_sv
+        if not (np.isfinite(T[0]) and np.isfinite(P[0])):
+            return _ConsistentPoint(self.triple_point.temperature, self.triple_point.pressure, False)
+        return _ConsistentPoint(T[0] * ureg.kelvin, P[0] * ureg.Pa, True)
+
+    def curves(self, clapeyron_lv=False):
+        """Phase boundary curves as shown in the phase diagram plot
+
+        The solid-liquid curve is truncated at the critical point pressure, the same way it is plotted.
+
+        Parameters
+        ----------
+        clapeyron_lv : bool, default=False
+            if the Clapeyron liquid-vapour curve will be included along the Antoine one
+
+        Returns
+        -------
+        dict
+            curve method name as key and tuple of arrays (temperature, pressure) as value
+        """
+        T_sl, P_sl = self.clapeyron_sl()
+        mask = P_sl < self.critical_point.pressure
+        curves = {'clapeyron_sl': (T_sl[:np.count_nonzero(mask)], P_sl[mask]),
+                  'clapeyron_sv': self.clapeyron_sv(),
+                  'antoine_lv': self.antoine_lv()}
+        if clapeyron_lv:
+            curves['clapeyron_lv'] = self.clapeyron_lv()
+        return curves
+
     def format_formula(self):
         """ Display chemical formulas in a proper way
         Returns
@@ -260,6 +432,72 @@ class PhaseDiagram:
             for point in points:
                 graph.plot_point(point['data_tuple'], label=point['label'], **point['kwargs'])
 
+    @staticmethod
+    def plot_overlay(compounds, ax=None, T_unit='K', P_unit='Pa', scale_log=True, legend=True, title=True,
+                     title_text='Calculated phase diagrams', clapeyron_lv=False, points=True, cmap='viridis'):
+        """
+        Overlays the phase diagrams of many compounds in a single plot
+
+        All curves are drawn as one LineCollection and all Triple Points and Critical Points as one scatter, with one
+        color per compound, and the plot is customized only once. Triple Points have a red edge and Critical Points a
+        purple one, as in `plot`.
+
+        Parameters
+        ----------
+        compounds : iterable
+            PhaseDiagram objects or compound names, formulas or CAS
+        ax : matplotlib axis, optional
+            axis where the plot will be shown. If None, one will be created
+        T_unit : str
+            pint unit of the temperature
+        P_unit : str
+            pint unit of the pressure
+        scale_log : bool, default=True
+            if the y-axis will have a log scale
+        legend : bool, default=True
+            if a legend with the compound formulas will be shown
+        title : bool, default=True
+            if the plot will have a title
+        title_text : str, default='Calculated phase diagrams'
+            title text
+        clapeyron_lv : bool, default=False
+            if the Clapeyron liquid-vapour curves will be plotted along the Antoine ones
+        points: bool, default=True
+            if Triple Points and Critical Points will be shown
+        cmap : str, default='viridis'
+            matplotlib colormap used to pick the compound colors
+        """
+        diagrams = [compound if isinstance(compound, PhaseDiagram) else PhaseDiagram(compound)
+                    for compound in compounds]
+        colors = matplotlib.colormaps[cmap](np.linspace(0, 1, len(diagrams)))
+
+        if ax is None:
+            fig, ax = plt.subplots(figsize=(10, 8), facecolor=(1.0, 1.0, 1.0))
+        ax.set_axisbelow(True)
+
+        graph = Plot(ax=ax, x_label='Temperature', y_label='Pressure', x_unit=T_unit, y_unit=P_unit, legend=False,
+                     scale_log=scale_log, title=title, title_text=title_text)
+
+        curves, curve_colors = [], []
+        for diagram, color in zip(diagrams, colors):
+            diagram_curves = list(diagram.curves(clapeyron_lv=clapeyron_lv).values())
+            curves.extend(diagram_curves)
+            curve_colors.extend([color] * len(diagram_curves))
+        graph.plot_line_collection(curves, colors=curve_colors, linewidths=3, zorder=1)
+
+        if points:
+            point_list = [diagram.triple_point for diagram in diagrams] + \
+                         [diagram.critical_point for diagram in diagrams]
+            edge_colors = ['red'] * len(diagrams) + ['purple'] * len(diagrams)
+            graph.plot_points(point_list, c=np.concatenate((colors, colors)), edgecolors=edge_colors, linewidths=2,
+                              s=100, zorder=2)
+
+        graph.plot_customization()
+        if legend:
+            handles = [Line2D([], [], color=color, linewidth=3, label=diagram.format_formula())
+                       for diagram, color in zip(diagrams, colors)]
+            ax.legend(handles=handles, loc='best', fontsize=14, ncol=max(1, len(handles) // 20))
+
     def physical_state(self, point):
         """
         Returns the physical state for a given point(temperature, pressure)
@@ -275,6 +513,7 @@ class PhaseDiagram:
         """
         state = ''
         clapeyron_sv = partial(self._clapeyron_sv_lv, curve='sv')
+        tolerances = {'tolerance': self.tolerance, 'relative_tolerance': self.relative_tolerance}
 
         # triple point temperature
 
@@ -297,11 +536,11 @@ class PhaseDiagram:
 
         # point on curve
 
-        elif point_in_function(point, self._antoine_lv):
+        elif point_in_function(point, self._antoine_lv, **tolerances):
             state = 'liquid-vapour curve'
-        elif point_in_function(point, self._clapeyron_sl):
+        elif point_in_function(point, self._clapeyron_sl, **tolerances):
             state = 'solid-liquid curve'
-        elif point_in_function(point, clapeyron_sv):
+        elif point_in_function(point, clapeyron_sv, **tolerances):
             state = 'solid-vapour curve'
 
         # regions
@@ -0,0 +1,151 @@
+"""Antoine coefficients fitted to vapour pressure data of many compounds at once
+
+The Antoine equation log10(P) = A - B / (T + C) is fitted to every dataset in a single vectorized pass:
+
+1. the equation is linearized as y T = A T + (A C - B) - C y, with y = log10(P), and the 3 x 3 least squares normal
+   equations of all datasets are built with `numpy.add.reduceat` over the rows sorted by compound and solved together
+   with `numpy.linalg.solve`;
+2. the linear estimates, which weight the errors by T + C, are refined with Levenberg-Marquardt iterations on the
+   residuals of log10(P), again for all datasets at once.
+
+Temperatures are centred and scaled in each dataset, which keeps the normal equations well conditioned.
+"""
+import numpy as np
+import pandas as pd
+
+from src.batch import group, _magnitudes
+from src.helpers import database
+
+COLUMNS = ['id', 't_min', 't_max', 'A', 'B', 'C']
+
+# conversion of A from pascal (SI) to mmHg, the unit of the antoine table
+_A_MMHG = np.log10(101325 / 760)
+
+
+def _group_sums(values, bounds):
+    return np.add.reduceat(values, bounds[:-1], axis=0)
+
+
+def _solve(matrices, vectors):
+    """Solves stacked 3 x 3 systems, with NaN solutions for the singular ones"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scale = np.abs(matrices).max(axis=(1, 2))
+        singular = ~(np.abs(np.linalg.det(matrices / scale[:, None, None])) > 1e-12)
+    matrices = np.where(singular[:, None, None], np.eye(3), matrices)
+    solutions = np.linalg.solve(matrices, vectors[..., np.newaxis])[..., 0]
+    solutions[singular] = np.nan
+    return solutions
+
+
+def _keys(compounds):
+    """
+    Integer grouping key and identifier of each row
+
+    String identifiers are resolved to database ids once per distinct value, so the names, formulas and CAS of one
+    compound are grouped together, and the ones missing from the database get distinct negative keys.
+    """
+    compounds = np.asarray(compounds).ravel()
+    if compounds.dtype.kind in 'iu':
+        return compounds.astype(np.int64), compounds
+    identifiers, inverse = np.unique(compounds.astype(str), return_inverse=True)
+    lookup = database().lookup
+    keys = np.array([lookup.get(identifier, -1 - i) for i, identifier in enumerate(identifiers)], dtype=np.int64)
+    return keys[inverse], identifiers[inverse]
+
+
+def _residuals(y, t, A, b, c):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return y - (A - b / (t + c))
+
+
+def fit(compounds, temperature, pressure, iterations=20, reference=None):
+    """
+    Fits Antoine coefficients to the vapour pressure data of many compounds
+
+    Parameters
+    ----------
+    compounds : array_like
+        compound of each row: names, formulas or CAS (str), or ids (int), which do not need to be in the database
+    temperature : array_like or pint.Quantity
+        temperatures, in kelvin if not a pint Quantity
+    pressure : array_like or pint.Quantity
+        vapour pressures, in pascal if not a pint Quantity
+    iterations : int, default=20
+        maximum number of Levenberg-Marquardt iterations, 0 to keep the linearized fit
+    reference : int, optional
+        if given, a `reference` column with this value is added, so the rows can be appended to the antoine table
+
+    Returns
+    -------
+    pandas.DataFrame
+        one row per compound with the columns of the antoine table (t_min and t_max in Celsius, A for pressures in
+        mmHg, B, C in Celsius), the number of `points`, the root mean square (`rmse`) and maximum absolute
+        (`max_error`) residuals in log10(P), and the `compound` identifier of its first row. The id of compounds
+        given by an identifier not in the database is missing (pandas.NA). Compounds with less than 3 points or
+        degenerate data have NaN coefficients
+    """
+    ids, identifiers = _keys(compounds)
+    T = np.broadcast_to(_magnitudes(temperature, 'K'), ids.shape).astype(float)
+    P = np.broadcast_to(_magnitudes(pressure, 'Pa'), ids.shape).astype(float)
+    if np.any(P <= 0):
+        raise ValueError('Pressures must be positive')
+
+    groups = group(ids)
+    bounds = groups.bounds
+    counts = np.diff(bounds)
+    T, y = T[groups.order], np.log10(P[groups.order])
+    rows = np.repeat(np.arange(len(groups.ids)), counts)
+
+    T_mean = _group_sums(T, bounds) / counts
+    T_scale = np.sqrt(_group_sums((T - T_mean[rows])**2, bounds) / counts)
+    T_scale[T_scale == 0] = 1.0
+    t = (T - T_mean[rows]) / T_scale[rows]
+
+    # linearized least squares in the scaled temperature: y t = A t + (A c - b) - c y
+    features = np.stack([t, np.ones_like(t), -y], axis=1)
+    matrices = _group_sums(features[:, :, None] * features[:, None, :], bounds)
+    vectors = _group_sums(features * (y * t)[:, None], bounds)
+    A, D, c = _solve(matrices, vectors).T
+    b = A * c - D
+
+    # Levenberg-Marquardt refinement; a step is kept only if it reduces the sum of squares of its compound, and the
+    # damping of that compound is decreased, otherwise it is increased
+    sse = _group_sums(_residuals(y, t, A[rows], b[rows], c[rows])**2, bounds)
+    damping = np.full(len(groups.ids), 1e-3)
+    for _ in range(iterations):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inverse = 1 / (t + c[rows])
+        jacobian = np.stack([np.ones_like(t), -inverse, b[rows] * inverse**2], axis=1)
+        residuals = _residuals(y, t, A[rows], b[rows], c[rows])
+        matrices = _group_sums(jacobian[:, :, None] * jacobian[:, None, :], bounds)
+        vectors = _group_sums(jacobian * residuals[:, None], bounds)
+        diagonal = np.einsum('gii->gi', matrices)
+        step = _solve(matrices + (damping[:, None] * diagonal)[:, :, None] * np.eye(3), vectors)
+        step[~np.isfinite(step)] = 0
+        A_new, b_new, c_new = A + step[:, 0], b + step[:, 1], c + step[:, 2]
+        sse_new = _group_sums(_residuals(y, t, A_new[rows], b_new[rows], c_new[rows])**2, bounds)
+        better = sse_new < sse
+        A, b, c = np.where(better, A_new, A), np.where(better, b_new, b), np.where(better, c_new, c)
+        sse = np.where(better, sse_new, sse)
+        damping = np.where(better, np.maximum(damping / 10, 1e-12), np.minimum(damping * 10, 1e12))
+        if np.all(np.abs(step) <= 1e-12 * (1 + np.abs(np.stack([A, b, c], axis=1)))):
+            break
+
+    residuals = np.abs(_residuals(y, t, A[rows], b[rows], c[rows]))
+    valid = np.isfinite(A) & np.isfinite(b) & np.isfinite(c) & (counts >= 3)
+    B = np.where(valid, b * T_scale, np.nan)
+    C = np.where(valid, c * T_scale - T_mean, np.nan)
+    result = pd.DataFrame({'id': pd.array(groups.ids, dtype='Int64'),
+                           't_min': np.minimum.reduceat(T, bounds[:-1]) - 273.15,
+                           't_max': np.maximum.reduceat(T, bounds[:-1]) - 273.15,
+                           'A': np.where(valid, A, np.nan) - _A_MMHG,
+                           'B': B,
+                           'C': C + 273.15,
+                           'points': counts,
+                           'rmse': np.where(valid, np.sqrt(sse / counts), np.nan),
+                           'max_error': np.where(valid, np.maximum.reduceat(residuals, bounds[:-1]), np.nan),
+                           'compound': identifiers[groups.order[bounds[:-1]]]})
+    result.loc[groups.ids < 0, 'id'] = pd.NA
+    if reference is not None:
+        result.insert(len(COLUMNS), 'reference', reference)
+    return result
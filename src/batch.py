@@ -0,0 +1,162 @@
+"""Physical state of rows of many compounds at once
+
+Tables of measurements often interleave many compounds. Instead of building a `PhaseDiagram` per row, the functions
+below resolve each distinct identifier once, sort the rows by compound id, classify every compound group with the
+vectorized `src.si.state_codes` and scatter the results back to the original row order.
+
+Example
+-------
+    states = physical_state(['water', 'CO2', 'H2O'], [300, 300, 400], [1e5, 1e5, 1e3])
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from phase_diagram import registry_lock
+from src import si
+from src.helpers import database, full_data_compounds
+
+Groups = namedtuple('groups', ['ids', 'order', 'bounds'])
+
+
+def compound_ids(compounds):
+    """
+    Database ids of compound identifiers, resolving each distinct identifier once
+
+    Parameters
+    ----------
+    compounds : array_like
+        compound names, formulas or CAS (str), or database ids (int)
+
+    Returns
+    -------
+    numpy.ndarray
+        integer array with the shape of `compounds`
+    """
+    compounds = np.asarray(compounds)
+    if compounds.dtype.kind in 'iu':
+        return compounds.astype(np.int64)
+    identifiers, inverse = np.unique(compounds.astype(str), return_inverse=True)
+    lookup = database().lookup
+    unknown = [identifier for identifier in identifiers if identifier not in lookup]
+    if unknown:
+        raise KeyError(f'Not valid compounds: {", ".join(unknown)}')
+    ids = np.array([lookup[identifier] for identifier in identifiers], dtype=np.int64)
+    return ids[inverse].reshape(compounds.shape)
+
+
+def group(ids):
+    """
+    Groups the rows of each compound by sorting their ids
+
+    Parameters
+    ----------
+    ids : array_like
+        compound database ids, one per row
+
+    Returns
+    -------
+    Groups
+        `ids` of the distinct compounds, the row `order` that sorts the rows by compound and the `bounds` of each
+        compound in that order: the rows of compound ids[i] are order[bounds[i]:bounds[i + 1]]
+    """
+    ids = np.asarray(ids).ravel()
+    order = np.argsort(ids, kind='stable')
+    sorted_ids = ids[order]
+    starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+    return Groups(sorted_ids[starts], order, np.r_[starts, len(ids)])
+
+
+def check_full_data(ids):
+    """
+    Raises a ValueError naming the compounds without the data needed to build a phase diagram
+
+    Parameters
+    ----------
+    ids : array_like
+        compound database ids
+    """
+    missing = np.setdiff1d(np.asarray(ids), full_data_compounds())
+    if len(missing):
+        compounds = database()['compounds'].set_index('id')['formula']
+        names = [f'{compounds.get(idx, "unknown")} (id {idx})' for idx in missing.tolist()]
+        raise ValueError(f'Compounds without full phase diagram data: {", ".join(names)}')
+
+
+def compound_id_parameters(idx):
+    """
+    Cached SI `Parameters` of a compound given its database id, see `src.si.compound_parameters`
+
+    Parameters
+    ----------
+    idx : int
+
+    Returns
+    -------
+    si.Parameters
+    """
+    compounds = database()['compounds']
+    cas = compounds.loc[compounds['id'] == idx, 'cas']
+    if cas.empty:
+        raise KeyError(f'No compound with id {idx}')
+    check_full_data([idx])
+    return si.compound_parameters(cas.iloc[0])
+
+
+def _magnitudes(values, unit):
+    if hasattr(values, 'm_as'):
+        with registry_lock:
+            return np.asarray(values.m_as(unit), dtype=float)
+    return np.asarray(values, dtype=float)
+
+
+def state_codes(compounds, temperature, pressure, tolerance=0.001, relative_tolerance=0):
+    """
+    Indexes in `si.STATES` of the physical states of rows of mixed compounds, following the rules of
+    `PhaseDiagram.physical_state`
+
+    Parameters
+    ----------
+    compounds : array_like
+        compound of each row: names, formulas or CAS (str), or database ids (int)
+    temperature : array_like or pint.Quantity
+        temperatures, in kelvin if not a pint Quantity
+    pressure : array_like or pint.Quantity
+        pressures, in pascal if not a pint Quantity
+    tolerance : float, default=0.001
+        absolute tolerance, in pascal, to decide if a point is on a curve
+    relative_tolerance : float, default=0
+        tolerance relative to the curve pressure, added to the absolute one
+
+    Returns
+    -------
+    numpy.ndarray
+        integer array with the broadcast shape of the inputs
+    """
+    ids, T, P = np.broadcast_arrays(compound_ids(compounds), _magnitudes(temperature, 'K'),
+                                    _magnitudes(pressure, 'Pa'))
+    shape = ids.shape
+    T, P = T.ravel(), P.ravel()
+    groups = group(ids)
+    check_full_data(groups.ids)
+    codes = np.empty(len(T), dtype=np.int64)
+    for idx, start, stop in zip(groups.ids, groups.bounds[:-1], groups.bounds[1:]):
+        rows = groups.order[start:stop]
+        codes[rows] = si.state_codes(compound_id_parameters(idx), T[rows], P[rows], tolerance=tolerance,
+                                     relative_tolerance=relative_tolerance)
+    return codes.reshape(shape)
+
+
+def physical_state(compounds, temperature, pressure, tolerance=0.001, relative_tolerance=0):
+    """
+    Physical states of rows of mixed compounds, following the rules of `PhaseDiagram.physical_state`
+
+    Parameters are the same of `state_codes`.
+
+    Returns
+    -------
+    numpy.ndarray
+        string array with the broadcast shape of the inputs
+    """
+    codes = state_codes(compounds, temperature, pressure, tolerance=tolerance, relative_tolerance=relative_tolerance)
+    return np.array(si.STATES)[codes]
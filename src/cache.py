@@ -0,0 +1,200 @@
+import hashlib
+import io
+import json
+import os
+import tempfile
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from phase_diagram import ureg
+from src.export import to_npz, read_npz
+from src import si
+
+
+class DiskCache:
+    def __init__(self, directory, max_size=256 * 2**20):
+        """
+        Size-bounded persistent cache of bytes values with least recently used (LRU) eviction
+
+        Values are written to a temporary file and then atomically renamed, so concurrent processes sharing the
+        directory never read partial entries. Reading an entry updates its modification time, which is used as the
+        LRU order.
+
+        Parameters
+        ----------
+        directory : str
+            directory where the entries will be stored. It is created if it does not exist
+        max_size : int, default=256 MiB
+            maximum total size of the entries in bytes
+        """
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def key(*parts):
+        """Hash key for JSON serializable parts"""
+        text = json.dumps(parts, sort_keys=True, default=str, separators=(',', ':'))
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.bin')
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+    def get(self, key):
+        """
+        Returns the value stored for a key
+
+        Parameters
+        ----------
+        key : str
+
+        Returns
+        -------
+        bytes or None
+            None if the key is not in the cache
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as file:
+                value = file.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return value
+
+    def set(self, key, value):
+        """
+        Stores a value for a key and evicts the least recently used entries if the cache is too big
+
+        Parameters
+        ----------
+        key : str
+        value : bytes
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(value)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        self.evict()
+
+    def _entries(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith('.bin'):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        return entries
+
+    @property
+    def size(self):
+        """Total size of the entries in bytes"""
+        return sum(size for mtime, size, path in self._entries())
+
+    def evict(self):
+        """Removes the least recently used entries until the total size is below `max_size`"""
+        entries = self._entries()
+        total = sum(size for mtime, size, path in entries)
+        for mtime, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        """Removes all entries"""
+        for mtime, size, path in self._entries():
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+def diagram_key(diagram, kind, **params):
+    """
+    Cache key for the data a phase diagram was built from, its curve settings, the kind of data and its parameters
+
+    The numeric data of the diagram itself (`si.parameters`) is hashed rather than the database file, so diagrams
+    built from a snapshot older than the file, or with `PhaseDiagram.from_parameters`, get their own entries.
+    """
+    return DiskCache.key(int(diagram.idx), diagram.name, diagram.formula, si.parameters(diagram),
+                         diagram.number_of_points, diagram.sampling_tolerance, kind, params)
+
+
+def cached_plot(diagram, cache, format='png', dpi=100, figsize=(10, 8), **kwargs):
+    """
+    Rendered phase diagram image, stored in the cache
+
+    The figure is created without pyplot, so nothing is added to the pyplot figure manager.
+
+    Parameters
+    ----------
+    diagram : PhaseDiagram
+    cache : DiskCache
+    format : str, default='png'
+        matplotlib image format
+    dpi : int, default=100
+        image resolution
+    figsize : tuple, default=(10, 8)
+        figure size in inches
+    **kwargs : optional
+        `PhaseDiagram.plot` arguments
+
+    Returns
+    -------
+    bytes
+        image content
+    """
+    key = diagram_key(diagram, 'plot', format=format, dpi=dpi, figsize=figsize, **kwargs)
+    image = cache.get(key)
+    if image is None:
+        fig = Figure(figsize=figsize, facecolor=(1.0, 1.0, 1.0))
+        FigureCanvasAgg(fig)
+        diagram.plot(ax=fig.subplots(), **kwargs)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=format, dpi=dpi)
+        image = buffer.getvalue()
+        cache.set(key, image)
+    return image
+
+
+def cached_curves(diagram, cache, clapeyron_lv=False):
+    """
+    Phase boundary curves, stored in the cache
+
+    Parameters
+    ----------
+    diagram : PhaseDiagram
+    cache : DiskCache
+    clapeyron_lv : bool, default=False
+        if the Clapeyron liquid-vapour curve will be included along the Antoine one
+
+    Returns
+    -------
+    dict
+        same as `PhaseDiagram.curves`
+    """
+    key = diagram_key(diagram, 'curves', clapeyron_lv=clapeyron_lv)
+    content = cache.get(key)
+    if content is None:
+        content = to_npz(diagram, clapeyron_lv=clapeyron_lv, points=False, dtype='float64')
+        cache.set(key, content)
+    curves = read_npz(content)['curves']
+    return {name: (curve['temperature'] * ureg.K, curve['pressure'] * ureg.Pa) for name, curve in curves.items()}
@@ -0,0 +1,202 @@
+import io
+import json
+
+import numpy as np
+
+from phase_diagram.phase_diagram import PhaseDiagram
+
+EXPORT_VERSION = 1
+
+
+def round_significant(array, precision):
+    """
+    Rounds an array to a given number of significant digits
+
+    Parameters
+    ----------
+    array : array_like
+        float values
+    precision : int or None
+        number of significant digits. If None, the array is returned unchanged
+
+    Returns
+    -------
+    numpy.ndarray
+    """
+    array = np.asarray(array, dtype=float)
+    if precision is None:
+        return array
+    return np.char.mod(f'%.{precision}g', array).astype(float)
+
+
+def decimate(array, step=1):
+    """Keeps every `step`-th value of an array, always keeping the last one"""
+    if step <= 1 or len(array) <= 2:
+        return array
+    idx = np.arange(0, len(array), step)
+    if idx[-1] != len(array) - 1:
+        idx = np.append(idx, len(array) - 1)
+    return array[idx]
+
+
+def diagram_data(diagram, T_unit='K', P_unit='Pa', precision=None, step=1, clapeyron_lv=False, points=True):
+    """
+    Curves and points of a phase diagram as plain NumPy arrays
+
+    Parameters
+    ----------
+    diagram : PhaseDiagram
+    T_unit : str
+        pint unit of the temperature
+    P_unit : str
+        pint unit of the pressure
+    precision : int, optional
+        number of significant digits. If None, full precision is kept
+    step : int, default=1
+        keeps every `step`-th point of each curve (and always the last one)
+    clapeyron_lv : bool, default=False
+        if the Clapeyron liquid-vapour curve will be exported along the Antoine one
+    points : bool, default=True
+        if Triple Point and Critical Point will be exported
+
+    Returns
+    -------
+    dict
+        compound identification, units, curves and points
+    """
+    curves = {}
+    for name, (T_arr, P_arr) in diagram.curves(clapeyron_lv=clapeyron_lv).items():
+        curves[name] = {'temperature': round_significant(decimate(T_arr.to(T_unit).magnitude, step), precision),
+                        'pressure': round_significant(decimate(P_arr.to(P_unit).magnitude, step), precision)}
+    data = {'version': EXPORT_VERSION,
+            'compound': {'name': diagram.name, 'formula': diagram.formula, 'cas': diagram.cas},
+            'units': {'temperature': T_unit, 'pressure': P_unit},
+            'curves': curves,
+            'points': {}}
+    if points:
+        for name in ('triple_point', 'critical_point'):
+            point = getattr(diagram, name)
+            data['points'][name] = round_significant((point.temperature.to(T_unit).magnitude,
+                                                      point.pressure.to(P_unit).magnitude), precision)
+    return data
+
+
+def _jsonable(data):
+    """Converts the arrays of a `diagram_data` dictionary to lists"""
+    data = dict(data)
+    data['curves'] = {name: {key: array.tolist() for key, array in curve.items()}
+                      for name, curve in data['curves'].items()}
+    data['points'] = {name: point.tolist() for name, point in data['points'].items()}
+    return data
+
+
+def to_json(diagram, T_unit='K', P_unit='Pa', precision=6, step=1, clapeyron_lv=False, points=True):
+    """
+    Compact JSON representation of a phase diagram
+
+    Parameters are the same of `diagram_data`, but `precision` defaults to 6 significant digits.
+
+    Returns
+    -------
+    str
+        JSON without whitespace between separators
+    """
+    data = diagram_data(diagram, T_unit=T_unit, P_unit=P_unit, precision=precision, step=step,
+                        clapeyron_lv=clapeyron_lv, points=points)
+    return json.dumps(_jsonable(data), separators=(',', ':'))
+
+
+def to_npz(diagram, file=None, T_unit='K', P_unit='Pa', precision=None, step=1, clapeyron_lv=False, points=True,
+           dtype='float32'):
+    """
+    Columnar binary representation of a phase diagram in NumPy `.npz` format
+
+    Each curve is stored as two columns named `<curve>/temperature` and `<curve>/pressure`, each point as a
+    column named `<point>` and the remaining data as a JSON string in the `metadata` column.
+
+    Parameters
+    ----------
+    diagram : PhaseDiagram
+    file : str or file-like, optional
+        where the data will be written. If None, the bytes are returned
+    dtype : str, default='float32'
+        NumPy float type of the columns
+    Other parameters are the same of `diagram_data`.
+
+    Returns
+    -------
+    bytes or None
+        the npz content if `file` is None
+    """
+    data = diagram_data(diagram, T_unit=T_unit, P_unit=P_unit, precision=precision, step=step,
+                        clapeyron_lv=clapeyron_lv, points=points)
+    columns = {}
+    for name, curve in data.pop('curves').items():
+        for key, array in curve.items():
+            columns[f'{name}/{key}'] = array.astype(dtype)
+    for name, point in data.pop('points').items():
+        columns[name] = point.astype(dtype)
+    columns['metadata'] = np.array(json.dumps(data))
+
+    if file is None:
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **columns)
+        return buffer.getvalue()
+    np.savez_compressed(file, **columns)
+
+
+def read_npz(file):
+    """
+    Reads data written by `to_npz`
+
+    Parameters
+    ----------
+    file : str, file-like or bytes
+
+    Returns
+    -------
+    dict
+        same structure of `diagram_data`
+    """
+    if isinstance(file, bytes):
+        file = io.BytesIO(file)
+    with np.load(file) as npz:
+        data = json.loads(npz['metadata'].item())
+        data['curves'] = {}
+        data['points'] = {}
+        for column in npz.files:
+            if column == 'metadata':
+                continue
+            if '/' in column:
+                name, key = column.split('/')
+                data['curves'].setdefault(name, {})[key] = npz[column]
+            else:
+                data['points'][column] = npz[column]
+    return data
+
+
+def write_json_lines(compounds, file, **kwargs):
+    """
+    Streams the phase diagrams of many compounds as JSON lines, one compound per line
+
+    Parameters
+    ----------
+    compounds : iterable
+        PhaseDiagram objects or compound names, formulas or CAS
+    file : file-like
+        text stream where the lines will be written
+    **kwargs : optional
+        `to_json` arguments
+
+    Returns
+    -------
+    int
+        number of lines written
+    """
+    count = 0
+    for compound in compounds:
+        diagram = compound if isinstance(compound, PhaseDiagram) else PhaseDiagram(compound)
+        file.write(to_json(diagram, **kwargs))
+        file.write('\n')
+        count += 1
+    return count
@@ -1,27 +1,231 @@
+import hashlib
+import os
 import sqlite3
+import threading
 from collections import namedtuple
-
-import pandas as pd
+from contextlib import contextmanager
 
 from phase_diagram import ureg
 
 DB = 'data/data.db'
 
 
+class Snapshot(dict):
+    """Dictionary of database tables read at one point in time, with a lazily built compound lookup index
+
+    `generation` counts the reloads that led to the snapshot, so caches can tell which snapshot their entries come
+    from.
+    """
+
+    def __init__(self, tables, checksums=None, signature=None, generation=0):
+        super().__init__(tables)
+        self.checksums = checksums or {}
+        self.signature = signature
+        self.generation = generation
+        self.full_data = None  # cached result of `full_data_compounds`
+        self._lookup = None
+
+    @property
+    def lookup(self):
+        """Dictionary of compound names, formulas and CAS numbers to compound indexes, as `compound_index`"""
+        if self._lookup is None:
+            self._lookup = _compound_lookup(self)
+        return self._lookup
+
+
+def _compound_lookup(tables):
+    compounds = tables['compounds']
+    lookup = {}
+    # formula and CAS matches take precedence over name matches, and lower rows over higher ones
+    for table in (tables['names'], compounds):
+        matches = {}
+        for column in table.columns:
+            for label, value in table[column].items():
+                if isinstance(value, str) and (value not in matches or label < matches[value]):
+                    matches[value] = label
+        lookup.update({value: compounds.loc[label, 'id'] for value, label in matches.items()})
+    return lookup
+
+
+def _file_signature(database):
+    stat = os.stat(database)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _table_checksums(conn):
+    """SHA-256 checksums of the rows of every table in a SQLite connection"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
+    checksums = {}
+    for (table_name,) in cursor.fetchall():
+        checksum = hashlib.sha256()
+        for row in conn.execute(f"select * from '{table_name}'"):
+            checksum.update(repr(row).encode())
+        checksums[table_name] = checksum.hexdigest()
+    return checksums
+
+
+def _read_tables(conn, table_names):
+    import pandas as pd
+
+    return {table_name: pd.read_sql(f"select * from '{table_name}'", conn) for table_name in table_names}
+
+
 def database_dict(database):
     """Generates a dictionary of databases from a given SQLite database"""
+    signature = _file_signature(database)
     with sqlite3.connect(database) as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
-        tables = cursor.fetchall()
-        d = {}
-        for t in tables:
-            table_name = t[0]
-            d[table_name] = pd.read_sql(f"select * from '{table_name}'", conn)
+        checksums = _table_checksums(conn)
+        d = Snapshot(_read_tables(conn, checksums), checksums, signature)
+    return d
+
+
+_d = None
+_lock = threading.Lock()  # guards the first load and the replacement of `_d`
+_reload_lock = threading.Lock()  # serializes `reload_database` calls
+_local = threading.local()
+_callbacks = []
+
+
+def database():
+    """
+    Returns the dictionary of tables of the database, loading it on first use
+
+    Inside `pinned_database` the pinned snapshot is returned instead of the current one.
+    """
+    global _d
+    pinned = getattr(_local, 'snapshot', None)
+    if pinned is not None:
+        return pinned
+    d = _d
+    if d is None:
+        with _lock:
+            if _d is None:
+                _d = database_dict(DB)
+            d = _d
     return d
 
 
-d = database_dict(DB)
+def __getattr__(name):
+    if name == 'd':
+        return database()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@contextmanager
+def pinned_database():
+    """
+    Context manager that pins the current database snapshot for the calling thread, so that all the helper
+    functions called inside it see the same tables even if the database is reloaded meanwhile
+    """
+    previous = getattr(_local, 'snapshot', None)
+    _local.snapshot = previous if previous is not None else database()
+    try:
+        yield _local.snapshot
+    finally:
+        _local.snapshot = previous
+
+
+def on_reload(callback):
+    """
+    Registers a function called after `reload_database` replaces the snapshot
+
+    The function receives the set of affected compound indexes, which may be empty if only rows of no compound
+    changed, or None if every compound may be affected, and the new snapshot, which `database` does not return to a
+    thread inside `pinned_database`. Reloads are serialized, callbacks included.
+    """
+    _callbacks.append(callback)
+    return callback
+
+
+def _affected_compounds(old, new, table_names):
+    """Compound indexes with rows added, removed or changed in the given tables, or None if not only compound rows"""
+    import pandas as pd
+
+    affected = set()
+    for table_name in table_names:
+        if table_name in ('references', 'phys_states'):
+            return None
+        tables = [tables[table_name] for tables in (old, new) if table_name in tables]
+        if any('id' not in table.columns for table in tables):
+            return None
+        rows = pd.concat(tables).drop_duplicates(keep=False)
+        affected.update(int(idx) for idx in rows['id'])
+    return affected
+
+
+def reload_database(force=False):
+    """
+    Reloads the tables of the database that changed since they were read
+
+    Changes are detected by the modification time and size of the file and then by the checksum of each table, and
+    only the changed tables are read again. The new snapshot replaces the current one at once, so readers see either
+    the old or the new tables, never a mix, and the functions registered with `on_reload` are called.
+
+    Parameters
+    ----------
+    force : bool, default=False
+        if the table checksums are compared even if the file modification time and size did not change
+
+    Returns
+    -------
+    set or None
+        affected compound indexes, or None if every compound may be affected
+    """
+    global _d
+    with _reload_lock:
+        old = _d
+        if old is None:
+            database()
+            return set()
+        signature = _file_signature(DB)
+        if signature == old.signature and not force:
+            return set()
+        # the tables are checksummed and read without holding `_lock`, so readers keep using the old snapshot
+        with sqlite3.connect(DB) as conn:
+            checksums = _table_checksums(conn)
+            changed = [table_name for table_name, checksum in checksums.items()
+                       if old.checksums.get(table_name) != checksum]
+            removed = [table_name for table_name in old if table_name not in checksums]
+            if not changed and not removed:
+                old.signature = signature
+                return set()
+            tables = {table_name: old[table_name] for table_name in checksums if table_name not in changed}
+            tables.update(_read_tables(conn, changed))
+        affected = _affected_compounds(old, tables, changed + removed)
+        snapshot = Snapshot(tables, checksums, signature, generation=old.generation + 1)
+        if not {'compounds', 'names'} & set(changed + removed):
+            snapshot._lookup = old._lookup
+        with _lock:
+            _d = snapshot
+        for callback in _callbacks:
+            callback(affected, snapshot)
+    return affected
+
+
+def full_data_compounds():
+    """
+    Returns the IDs of the compounds with all the data needed to build a complete phase diagram
+
+    Returns
+    -------
+    list
+        compound indexes in the database
+    """
+    d = database()
+    if d.full_data is None:
+        d.full_data = _full_data_compounds(d)
+    return list(d.full_data)
+
+
+def _full_data_compounds(d):
+    ids = set(d['compounds']['id'])
+    for table in ('antoine', 'boiling_point', 'melting_point', 'triple_point', 'critical_point', 'h_melt', 'h_sub',
+                  'h_vap_boil'):
+        ids &= set(d[table]['id'])
+    for state in ('solid', 'liquid'):
+        ids &= set(d['density'].loc[d['density']['state'] == state_index(state), 'id'])
+    return sorted(int(idx) for idx in ids)
 
 
 def compound_index(compound):
@@ -37,6 +241,13 @@ def compound_index(compound):
     int
         compound index in the database
     """
+    d = database()
+    if isinstance(compound, str):
+        try:
+            return d.lookup[compound]
+        except KeyError:
+            print(f'{compound} not found. Not a valid compound.')
+            return None
     compound_name_idx = d['names'].loc[d['names'].isin([compound]).any(axis=1)].index.tolist()
     compound_formula_cas_idx = d['compounds'].loc[d['compounds'].isin([compound]).any(axis=1)].index.tolist()
     try:
@@ -61,6 +272,7 @@ def compound_identification(compound):
     namedtuple
         compound identification parameters
     """
+    d = database()
     compound_idx = compound_index(compound)
     compound_ident_tuple = list(d['compounds'].loc[(d['compounds']['id'] == compound_idx)].itertuples(index=False,
                                                                                                       name=None))[0]
@@ -81,6 +293,7 @@ def compound_names(compound):
     namedtuple
         compound available names
     """
+    d = database()
     compound_idx = compound_index(compound)
     compound_names_tuple = list(d['names'].loc[(d['names']['id'] == compound_idx)].itertuples(index=False,
                                                                                               name=None))[0]
@@ -90,6 +303,7 @@ def compound_names(compound):
 
 def state_index(state):
     """Return the ID for a given state string"""
+    d = database()
     try:
         return d['phys_states'].loc[d['phys_states']['state'] == state, 'id'].item()
     except ValueError:
@@ -98,6 +312,7 @@ def state_index(state):
 
 def density_table(compound):
     """Generates a density dataframe for a given compound"""
+    d = database()
     compound_idx = compound_index(compound)
     try:
         return d['density'].loc[(d['density']['id'] == compound_idx)]
@@ -118,6 +333,7 @@ def density(compound, state, value_index=0):
 
 def antoine_table(compound):
     """Generates a Antoine coefficients dataframe for a given compound"""
+    d = database()
     compound_idx = compound_index(compound)
     try:
         return d['antoine'].loc[(d['antoine']['id'] == compound_idx)]
@@ -139,6 +355,7 @@ def antoine(compound, value_index=0):
 
 def point_table(compound, point_name):
     """Generates dataframe with data for given point for a given compound"""
+    d = database()
     compound_idx = compound_index(compound)
     try:
         return d[point_name].loc[d[point_name]['id'] == compound_idx]
@@ -161,6 +378,7 @@ def point(compound, point_name, value_index=0):
 
 def enthalpy_table(compound, enthalpy_name):
     """Generates a enthalpy dataframe for a given compound"""
+    d = database()
     compound_idx = compound_index(compound)
     name_dict = {'fusion': 'h_melt',
                  'sublimation': 'h_sub',
@@ -187,6 +405,7 @@ def volume_change_fusion_calc(density_liquid, density_solid, molar_mass):
 @ureg.wraps('(cm**3)/mole', [None, None, None, None])
 def volume_change_fusion(compound, value_index=0, calc=True, calc_values_index=(0, 0)):
     """Returns the molar volume change during fusion for a given compound"""
+    d = database()
     compound_idx = compound_index(compound)
     if calc:
         d_sol = density(compound, 'solid', calc_values_index[0])
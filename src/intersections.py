@@ -0,0 +1,216 @@
+"""Intersections of the phase boundary curves, for many compounds at once
+
+The Antoine liquid-vapour curve and the Clausius-Clapeyron curves are anchored independently (the Clapeyron ones at
+the tabulated triple point), so they generally do not meet exactly at the tabulated triple point. The intersections
+of the Antoine curve with the Clapeyron solid-vapour, solid-liquid and liquid-vapour curves are computed here with a
+vectorized Newton iteration on the pressure ratio P_curve / P_antoine - 1, with analytic derivatives:
+
+1. each ratio is evaluated on a coarse grid of temperatures for every compound and the sign change closest to the
+   tabulated triple point gives a bracket of the root. The grid covers only the validity range of the Antoine
+   coefficients, within `max_shift` kelvin of the tabulated triple point, so the Antoine curve is never extrapolated
+   and distant crossings are not mistaken for the triple point;
+2. Newton steps are taken for all compounds at once, falling back to bisection for the compounds whose step leaves
+   its bracket, until every root converges.
+
+Where the curves do not cross in that window the result is NaN. The Antoine / Clapeyron solid-vapour intersection is a
+triple point consistent with the curves, see `consistent_parameters`; compounds without it keep the tabulated one.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from src import si
+from src.batch import compound_ids, compound_id_parameters
+from src.helpers import full_data_compounds
+
+CURVES = ('clapeyron_sv', 'clapeyron_sl', 'clapeyron_lv')
+
+Point = namedtuple('point', ['temperature', 'pressure'])
+Intersections = namedtuple('intersections', CURVES)
+
+
+def stack(parameters):
+    """
+    `si.Parameters` of arrays from a sequence of `si.Parameters`, to be used with the `si` functions
+
+    Parameters
+    ----------
+    parameters : si.Parameters or sequence of si.Parameters
+
+    Returns
+    -------
+    si.Parameters
+        each field is a float array with one value per compound
+    """
+    if isinstance(parameters, si.Parameters):
+        return si.Parameters(*(np.atleast_1d(np.asarray(value, dtype=float)) for value in parameters))
+    return si.Parameters(*np.array(parameters, dtype=float).reshape(-1, len(si.FIELDS)).T)
+
+
+def _antoine(params, T):
+    P = si.antoine_lv(params, T)
+    return P, P * np.log(10) * params.antoine_B / (params.antoine_C + T)**2
+
+
+def _clapeyron_sv(params, T):
+    P = si.clapeyron_sv(params, T)
+    return P, P * params.enthalpy_sublimation / (si.gas_constant * T**2)
+
+
+def _clapeyron_lv(params, T):
+    P = si.clapeyron_lv(params, T)
+    return P, P * params.enthalpy_vaporization / (si.gas_constant * T**2)
+
+
+def _clapeyron_sl(params, T):
+    return si.clapeyron_sl(params, T), params.enthalpy_fusion / (params.volume_change_fusion * T)
+
+
+_FUNCTIONS = {'clapeyron_sv': _clapeyron_sv, 'clapeyron_sl': _clapeyron_sl, 'clapeyron_lv': _clapeyron_lv}
+
+
+def _ratio(curve, params, T):
+    """P_curve / P_antoine - 1 and its derivative with respect to the temperature"""
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        P, dP = curve(params, T)
+        P_antoine, dP_antoine = _antoine(params, T)
+        return P / P_antoine - 1, (dP * P_antoine - P * dP_antoine) / P_antoine**2
+
+
+def _brackets(params, grid_points, max_shift):
+    """Grid cells with the sign change of each ratio closest to the triple point, NaN where there is none"""
+    lower = np.maximum(params.antoine_Tmin, params.triple_temperature - max_shift)
+    upper = np.minimum(params.antoine_Tmax, params.triple_temperature + max_shift)
+    # an empty window gives an all-NaN grid, so no sign change is found
+    lower, upper = np.where(lower <= upper, lower, np.nan), np.where(lower <= upper, upper, np.nan)
+    T = lower[:, np.newaxis] + np.linspace(0, 1, grid_points) * (upper - lower)[:, np.newaxis]
+    columns = si.Parameters(*(value[:, np.newaxis] for value in params))
+    distance_to_triple = np.abs((T[:, 1:] + T[:, :-1]) / 2 - columns.triple_temperature)
+    rows = np.arange(len(T))
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        P_antoine = si.antoine_lv(columns, T)
+        for name in CURVES:
+            sign = np.sign(getattr(si, name)(columns, T) - P_antoine)
+            distance = np.where(sign[:, 1:] * sign[:, :-1] <= 0, distance_to_triple, np.inf)
+            distance[np.isnan(distance)] = np.inf
+            cell = np.argmin(distance, axis=1)
+            found = np.isfinite(distance[rows, cell])
+            yield name, np.where(found, T[rows, cell], np.nan), np.where(found, T[rows, cell + 1], np.nan)
+
+
+def _newton(curve, params, lower, upper, max_iterations=50, tolerance=1e-12):
+    """Safeguarded Newton iteration for the roots of the ratio inside the brackets, for all compounds at once"""
+    f_lower = _ratio(curve, params, lower)[0]
+    T = (lower + upper) / 2
+    for _ in range(max_iterations):
+        f, df = _ratio(curve, params, T)
+        # shrink the brackets around the roots
+        same_sign = np.sign(f) == np.sign(f_lower)
+        lower, f_lower = np.where(same_sign, T, lower), np.where(same_sign, f, f_lower)
+        upper = np.where(same_sign, upper, T)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            T_new = T - f / df
+        outside = ~((T_new > lower) & (T_new < upper))
+        T_new = np.where(f == 0, T, np.where(outside, (lower + upper) / 2, T_new))
+        converged = np.abs(T_new - T) <= tolerance * np.abs(T)
+        T = T_new
+        if np.all(converged | np.isnan(T)):
+            break
+    return T
+
+
+def intersections(params, max_shift=5.0, grid_points=64):
+    """
+    Intersections of the Antoine liquid-vapour curve with the Clausius-Clapeyron curves
+
+    Parameters
+    ----------
+    params : si.Parameters or sequence of si.Parameters
+        parameters of one or many compounds
+    max_shift : float, default=5.0
+        maximum distance in kelvin between an intersection and the tabulated triple point temperature. Intersections
+        must also be inside the validity range of the Antoine coefficients. Use numpy.inf to search the whole range,
+        e.g. for the liquid-vapour crossover
+    grid_points : int, default=64
+        number of temperatures of the grid used to bracket the roots
+
+    Returns
+    -------
+    Intersections
+        for each Clapeyron curve, a Point of arrays of temperatures (K) and pressures (Pa), one per compound. When the
+        curves cross more than once the intersection closest to the tabulated triple point is returned, and NaN when
+        they do not cross within the allowed range
+    """
+    params = stack(params)
+    result = {}
+    for name, lower, upper in _brackets(params, grid_points, max_shift):
+        T = _newton(_FUNCTIONS[name], params, lower, upper)
+        result[name] = Point(T, si.antoine_lv(params, T))
+    return Intersections(**result)
+
+
+def consistent_parameters(params, result=None, max_shift=5.0):
+    """
+    Parameters with the triple point moved to the intersection of the Antoine and Clapeyron solid-vapour curves
+
+    The solid-vapour curve is unchanged, as it already passes through that point, and the solid-liquid and Clapeyron
+    liquid-vapour curves are anchored at it, so all the curves of `si.curves` and the rules of `si.state_codes` meet at
+    the same triple point. Compounds without intersection inside the Antoine validity range and within `max_shift` of
+    the tabulated triple point keep the tabulated one.
+
+    Parameters
+    ----------
+    params : si.Parameters or sequence of si.Parameters
+    result : Intersections, optional
+        result of `intersections` for `params`, computed with `max_shift` if not given
+    max_shift : float, default=5.0
+        see `intersections`
+
+    Returns
+    -------
+    si.Parameters or list of si.Parameters
+        same form as `params`
+    """
+    single = isinstance(params, si.Parameters)
+    arrays = stack(params)
+    if result is None:
+        result = intersections(arrays, max_shift=max_shift)
+    T, P = result.clapeyron_sv
+    found = np.isfinite(T) & np.isfinite(P)
+    arrays = arrays._replace(triple_temperature=np.where(found, T, arrays.triple_temperature),
+                             triple_pressure=np.where(found, P, arrays.triple_pressure))
+    rows = [si.Parameters(*row) for row in np.stack(arrays, axis=1).tolist()]
+    return rows[0] if single else rows
+
+
+def compound_intersections(compounds=None, max_shift=5.0):
+    """
+    Curve intersections of many compounds as a table
+
+    Parameters
+    ----------
+    compounds : array_like, optional
+        compound names, formulas, CAS or database ids. If None, every compound with full data
+    max_shift : float, default=5.0
+        see `intersections`
+
+    Returns
+    -------
+    pandas.DataFrame
+        indexed by compound id, with, for each Clapeyron curve, the temperature (K) and pressure (Pa) of its
+        intersection with the Antoine curve, the `shift` of the temperature from the tabulated triple point and whether
+        it was `found`. Where it was not found, the temperature and pressure are the tabulated triple point ones
+    """
+    ids = compound_ids(full_data_compounds() if compounds is None else compounds).ravel()
+    params = stack([compound_id_parameters(idx) for idx in ids])
+    result = intersections(params, max_shift=max_shift)
+    columns = {}
+    for name in CURVES:
+        T, P = getattr(result, name)
+        found = np.isfinite(T) & np.isfinite(P)
+        columns[f'{name}_temperature'] = np.where(found, T, params.triple_temperature)
+        columns[f'{name}_pressure'] = np.where(found, P, params.triple_pressure)
+        columns[f'{name}_shift'] = T - params.triple_temperature
+        columns[f'{name}_found'] = found
+    return pd.DataFrame(columns, index=pd.Index(ids, name='id'))
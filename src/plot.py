@@ -1,4 +1,6 @@
+import numpy as np
 from matplotlib import pyplot as plt
+from matplotlib.collections import LineCollection
 from phase_diagram import ureg
 
 
@@ -47,9 +49,9 @@ class Plot:
 
         # grid and ticks settings
         self.ax.minorticks_on()
-        self.ax.grid(b=True, which='major', linestyle='--',
+        self.ax.grid(True, which='major', linestyle='--',
                      linewidth=linewidth - 0.5)
-        self.ax.grid(b=True, which='minor', axis='both',
+        self.ax.grid(True, which='minor', axis='both',
                      linestyle=':', linewidth=linewidth - 1)
         self.ax.tick_params(which='both', labelsize=size + 2)
         self.ax.tick_params(which='major', length=6, axis='both')
@@ -122,3 +124,46 @@ class Plot:
         """
         self.ax.scatter(tuple_point[0].to(self.x_unit), tuple_point[1].to(self.y_unit), label=label, **kwargs)
         self.plot_customization()
+
+    def plot_line_collection(self, list_tuple_two_arrays, **kwargs):
+        """
+        Creates many lines in a plot as a single artist. The plot is not customized, call `plot_customization`
+        after adding all artists
+
+        Parameters
+        ----------
+        list_tuple_two_arrays : list
+            list of tuples with two arrays (x array, y array) with pint units
+        **kwargs : optional
+            matplotlib LineCollection arguments, e.g. `colors` with one color per line
+
+        Returns
+        -------
+        LineCollection
+        """
+        segments = [np.column_stack((x.to(self.x_unit).magnitude, y.to(self.y_unit).magnitude))
+                    for x, y in list_tuple_two_arrays]
+        collection = LineCollection(segments, **kwargs)
+        self.ax.add_collection(collection)
+        self.ax.autoscale_view()
+        return collection
+
+    def plot_points(self, list_tuple_points, **kwargs):
+        """
+        Creates many points in a plot as a single artist. The plot is not customized, call `plot_customization`
+        after adding all artists
+
+        Parameters
+        ----------
+        list_tuple_points : list
+            list of tuples with two values (x value, y value) with pint units
+        **kwargs : optional
+            matplotlib scatter arguments, e.g. `c` with one color per point
+
+        Returns
+        -------
+        PathCollection
+        """
+        x = [point[0].to(self.x_unit).magnitude for point in list_tuple_points]
+        y = [point[1].to(self.y_unit).magnitude for point in list_tuple_points]
+        return self.ax.scatter(x, y, **kwargs)
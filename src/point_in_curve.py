@@ -1,7 +1,7 @@
 import numpy as np
 
 
-def point_in_function(point, function, tolerance=0.001):
+def point_in_function(point, function, tolerance=0.001, relative_tolerance=0):
     """
     Verifies if a given point coordinates are in a given function domain/image
 
@@ -10,9 +10,12 @@ def point_in_function(point, function, tolerance=0.001):
     point : tuple of pint quantities
     function : function
     tolerance : float, optional
+        absolute tolerance, in the magnitude of the function image
+    relative_tolerance : float, optional
+        tolerance relative to the function image, added to the absolute one
 
     Returns
     -------
     bool
     """
-    return np.isclose(point[1].magnitude, function(point[0]).magnitude, atol=tolerance, rtol=0)
+    return np.isclose(point[1].magnitude, function(point[0]).magnitude, atol=tolerance, rtol=relative_tolerance)
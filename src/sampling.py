@@ -0,0 +1,52 @@
+import numpy as np
+
+
+def adaptive_temperatures(function, start, stop, tolerance=0.01, initial_points=5, max_points=2000):
+    """
+    Temperatures where a pressure curve must be sampled so that straight segments in (T, log P) deviate from it by
+    at most `tolerance` decades, as in the log-scaled plots
+
+    Every segment whose midpoint deviates more than `tolerance` from the curve is split in two, in vectorized passes,
+    until all segments pass the test. Nearly straight parts of the curve keep few points and the points concentrate
+    where it bends, e.g. next to the triple point.
+
+    Parameters
+    ----------
+    function : callable
+        pressure (Pa) as a function of a float array of temperatures (K)
+    start : float
+        first temperature
+    stop : float
+        last temperature, may be lower than `start`
+    tolerance : float, default=0.01
+        maximum deviation in decades of pressure (|log10(P / P_curve)|)
+    initial_points : int, default=5
+        number of evenly spaced points the refinement starts from
+    max_points : int, default=2000
+        refinement stops when this number of points is reached
+
+    Returns
+    -------
+    numpy.ndarray
+        temperatures from `start` to `stop`
+    """
+    def log_pressure(t):
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            return np.log10(function(start + t * (stop - start)))
+
+    t = np.linspace(0, 1, initial_points)
+    y = log_pressure(t)
+    # segments shorter than this cannot be split in distinct float temperatures
+    min_width = 8 * np.finfo(float).eps * max(abs(start), abs(stop), 1) / max(abs(stop - start), np.finfo(float).tiny)
+    while len(t) < max_points:
+        t_mid = (t[:-1] + t[1:]) / 2
+        y_mid = log_pressure(t_mid)
+        split = (np.abs(y_mid - (y[:-1] + y[1:]) / 2) > tolerance) & (np.diff(t) > min_width)
+        if not split.any():
+            break
+        split_idx = np.flatnonzero(split)[:max_points - len(t)]
+        t = np.insert(t, split_idx + 1, t_mid[split_idx])
+        y = np.insert(y, split_idx + 1, y_mid[split_idx])
+    temperatures = start + t * (stop - start)
+    temperatures[-1] = stop
+    return temperatures
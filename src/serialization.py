@@ -0,0 +1,106 @@
+"""Compact binary serialization of PhaseDiagram objects
+
+The format stores the numeric data as SI magnitudes (see `src.si`), the Antoine coefficients as read from the
+database, the identification strings and the curve settings, preceded by a magic string and a schema version. Units
+are bound again to the registry of the loading process, so no pint or pandas object is serialized.
+
+Schema versions:
+
+1. SI parameters, settings and the name, formula, CAS and alternative names (still read)
+2. adds the database Antoine coefficients and the `compound` identifier, and keeps missing (NaN) alternative names
+"""
+import math
+import struct
+
+from phase_diagram.phase_diagram import PhaseDiagram
+from src import si
+
+MAGIC = b'PHDG'
+SCHEMA_VERSION = 2
+
+_header = struct.Struct('<4sB')
+_bodies = {1: struct.Struct(f'<q{len(si.FIELDS)}dqddd'),
+           2: struct.Struct(f'<q{len(si.FIELDS)}d5dqddd')}
+_length = struct.Struct('<H')
+_NONE = 0xFFFF
+_NAN = 0xFFFE
+
+
+def _pack_string(text):
+    if text is None:
+        return _length.pack(_NONE)
+    if isinstance(text, float) and math.isnan(text):
+        return _length.pack(_NAN)
+    encoded = text.encode()
+    return _length.pack(len(encoded)) + encoded
+
+
+def _unpack_string(data, offset):
+    (length,) = _length.unpack_from(data, offset)
+    offset += _length.size
+    if length == _NONE:
+        return None, offset
+    if length == _NAN:
+        return math.nan, offset
+    return data[offset:offset + length].decode(), offset + length
+
+
+def dumps(diagram):
+    """
+    Serializes a PhaseDiagram object
+
+    Parameters
+    ----------
+    diagram : PhaseDiagram
+
+    Returns
+    -------
+    bytes
+    """
+    sampling_tolerance = math.nan if diagram.sampling_tolerance is None else diagram.sampling_tolerance
+    body = _bodies[SCHEMA_VERSION].pack(int(diagram.idx), *si.parameters(diagram),
+                                        *(float(value) for value in diagram.antoine), diagram.number_of_points,
+                                        diagram.tolerance, diagram.relative_tolerance, sampling_tolerance)
+    strings = (diagram.compound, diagram.name, diagram.formula, diagram.cas, *diagram.alternative_names)
+    return _header.pack(MAGIC, SCHEMA_VERSION) + body + b''.join(_pack_string(text) for text in strings)
+
+
+def loads(data, cls=None):
+    """
+    Deserializes a PhaseDiagram object written by `dumps`
+
+    Parameters
+    ----------
+    data : bytes
+    cls : type, optional
+        PhaseDiagram subclass to instantiate, PhaseDiagram if not given
+
+    Returns
+    -------
+    PhaseDiagram
+    """
+    cls = PhaseDiagram if cls is None else cls
+    magic, version = _header.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError('Not a serialized PhaseDiagram')
+    if version not in _bodies:
+        raise ValueError(f'Unsupported PhaseDiagram schema version {version}')
+    values = _bodies[version].unpack_from(data, _header.size)
+    idx = values[0]
+    params = si.Parameters(*values[1:1 + len(si.FIELDS)])
+    antoine = values[1 + len(si.FIELDS):6 + len(si.FIELDS)] if version >= 2 else None
+    number_of_points, tolerance, relative_tolerance, sampling_tolerance = values[-4:]
+
+    offset = _header.size + _bodies[version].size
+    strings = []
+    for _ in range(7 if version >= 2 else 6):
+        text, offset = _unpack_string(data, offset)
+        strings.append(text)
+    if version == 1:
+        strings.insert(0, strings[0])
+    compound, name, formula, cas, *alternative_names = strings
+    if math.isnan(sampling_tolerance):
+        sampling_tolerance = None
+    return cls.from_parameters(params, idx, name, formula, cas, alternative_names, compound=compound,
+                               antoine=antoine, number_of_points=number_of_points, tolerance=tolerance,
+                               relative_tolerance=relative_tolerance, sampling_tolerance=sampling_tolerance)
@@ -0,0 +1,179 @@
+"""Compound data in shared memory for multiprocessing worker pools
+
+The parent process loads the database once and packs the SI parameters (see `src.si`) of the compounds in a
+`multiprocessing.shared_memory` block. Workers attach to the block by name, read-only, and build `PhaseDiagram`
+objects from it without reading SQLite or building pandas tables.
+
+Example
+-------
+    def work(name, compound):
+        with SharedDatabase.attach(name) as database:
+            return database.phase_diagram(compound).physical_state(...)
+
+    with SharedDatabase.create() as database:
+        with multiprocessing.Pool() as pool:
+            pool.starmap(work, [(database.name, 'water'), (database.name, 'CO2')])
+"""
+import json
+import struct
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from phase_diagram.phase_diagram import PhaseDiagram
+from src import si
+from src.helpers import full_data_compounds, database
+
+HEADER = struct.Struct('<QQQ')  # rows, columns, identification JSON length
+
+
+def _attach(name):
+    """
+    Attaches to an existing block without tracking it, so that processes exiting do not unlink it
+
+    Before Python 3.13 blocks are always tracked, which is harmless for workers started by `multiprocessing`, since
+    they share the resource tracker of the parent, but unrelated processes attaching would unlink the block on exit.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedDatabase:
+    def __init__(self, shm, owner=False):
+        """
+        Read-only view of compound data in a shared memory block. Use `create` or `attach` to instantiate it
+
+        Parameters
+        ----------
+        shm : multiprocessing.shared_memory.SharedMemory
+            block with the packed data
+        owner : bool, default=False
+            if the block was created by this object, and will be unlinked by `close`
+        """
+        self.shm = shm
+        self.owner = owner
+        rows, columns, length = HEADER.unpack_from(shm.buf)
+        offset = HEADER.size
+        self.parameters_array = np.ndarray((rows, columns), dtype=np.float64, buffer=shm.buf, offset=offset)
+        self.parameters_array.flags.writeable = False
+        offset += self.parameters_array.nbytes
+        self.identification = json.loads(bytes(shm.buf[offset:offset + length]).decode())
+        self._rows = {}
+        for row, compound in enumerate(self.identification):
+            for identifier in (compound['name'], compound['formula'], compound['cas'], *compound['alternative_names']):
+                if identifier is not None:
+                    self._rows.setdefault(identifier, row)
+
+    @classmethod
+    def create(cls, compounds=None):
+        """
+        Packs compound data in a new shared memory block
+
+        Parameters
+        ----------
+        compounds : iterable, optional
+            compound indexes in the database. If None, every compound with full data
+
+        Returns
+        -------
+        SharedDatabase
+        """
+        if compounds is None:
+            compounds = full_data_compounds()
+        table = database()['compounds'].set_index('id')
+        rows, identification = [], []
+        for idx in compounds:
+            diagram = PhaseDiagram(table.loc[idx, 'cas'])
+            rows.append(si.parameters(diagram))
+            identification.append({'idx': int(idx), 'name': diagram.name, 'formula': diagram.formula,
+                                   'cas': diagram.cas,
+                                   'alternative_names': [name if isinstance(name, str) else None
+                                                         for name in diagram.alternative_names]})
+        array = np.array(rows, dtype=np.float64).reshape(len(rows), len(si.FIELDS))
+        text = json.dumps(identification).encode()
+
+        shm = shared_memory.SharedMemory(create=True, size=HEADER.size + array.nbytes + len(text))
+        HEADER.pack_into(shm.buf, 0, *array.shape, len(text))
+        shm.buf[HEADER.size:HEADER.size + array.nbytes] = array.tobytes()
+        shm.buf[HEADER.size + array.nbytes:HEADER.size + array.nbytes + len(text)] = text
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """
+        Attaches to a block created by `create` in another process
+
+        Parameters
+        ----------
+        name : str
+            `name` of the SharedDatabase that created the block
+
+        Returns
+        -------
+        SharedDatabase
+        """
+        return cls(_attach(name))
+
+    @property
+    def name(self):
+        """Name of the shared memory block, to be passed to the workers"""
+        return self.shm.name
+
+    def row(self, compound):
+        """Row of a compound, given its name, formula or CAS"""
+        try:
+            return self._rows[compound]
+        except KeyError:
+            raise KeyError(f'{compound} is not in the shared database') from None
+
+    def parameters(self, compound):
+        """
+        SI parameters of a compound
+
+        Parameters
+        ----------
+        compound : str
+            compound name, formula or CAS
+
+        Returns
+        -------
+        src.si.Parameters
+        """
+        return si.Parameters(*self.parameters_array[self.row(compound)].tolist())
+
+    def phase_diagram(self, compound, **kwargs):
+        """
+        PhaseDiagram object of a compound
+
+        Parameters
+        ----------
+        compound : str
+            compound name, formula or CAS
+        **kwargs : optional
+            `PhaseDiagram` arguments
+
+        Returns
+        -------
+        PhaseDiagram
+        """
+        row = self.row(compound)
+        identification = self.identification[row]
+        return PhaseDiagram.from_parameters(si.Parameters(*self.parameters_array[row].tolist()),
+                                            identification['idx'], identification['name'],
+                                            identification['formula'], identification['cas'],
+                                            identification['alternative_names'], compound=compound, **kwargs)
+
+    def close(self):
+        """Detaches from the block, unlinking it if this object created it"""
+        self.parameters_array = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,255 @@
+"""Phase diagram data and functions on plain SI magnitudes, safe for concurrent use
+
+`PhaseDiagram` objects rely on the shared pint registry, on the pandas tables of `src.helpers` and, for plots, on the
+pyplot global state, none of which is safe to use from many threads at once. This module offers the same curves and
+physical state rules working only on immutable `Parameters` named tuples of floats and on NumPy arrays of
+temperatures (K) and pressures (Pa):
+
+* the registry is used only when parameters are built, always holding `phase_diagram.registry_lock`, and the results
+  are cached, so concurrent queries never touch pint;
+* the functions below keep no state and only call NumPy ufuncs, which release the GIL while looping over float arrays,
+  so threads classifying or sampling large arrays run in parallel;
+* for plots in threads, create figures with `matplotlib.figure.Figure` and pass the axis to `PhaseDiagram.plot`
+  instead of letting it call pyplot (see `src.cache.cached_plot`).
+"""
+import threading
+from collections import namedtuple
+from functools import partial
+
+import numpy as np
+from scipy import constants
+
+from phase_diagram import registry_lock, ureg
+from phase_diagram.phase_diagram import PhaseDiagram
+from src.helpers import database, on_reload, pinned_database
+from src.sampling import adaptive_temperatures
+
+FIELDS = ('molar_mass', 'density_solid', 'density_liquid',
+          'antoine_Tmin', 'antoine_Tmax', 'antoine_A', 'antoine_B', 'antoine_C',
+          'boiling_temperature', 'boiling_pressure', 'melting_temperature', 'melting_pressure',
+          'triple_temperature', 'triple_pressure', 'critical_temperature', 'critical_pressure',
+          'enthalpy_fusion', 'enthalpy_sublimation', 'enthalpy_vaporization', 'volume_change_fusion')
+
+UNITS = ('kg/mol', 'kg/m**3', 'kg/m**3',
+         None, None, None, None, None,
+         'K', 'Pa', 'K', 'Pa',
+         'K', 'Pa', 'K', 'Pa',
+         'J/mol', 'J/mol', 'J/mol', 'm**3/mol')
+
+Parameters = namedtuple('parameters', FIELDS)
+
+_units = tuple(None if unit is None else ureg.Unit(unit) for unit in UNITS)
+
+STATES = ('', 'solid', 'liquid', 'vapour', 'gas', 'supercritical fluid',
+          'solid-liquid curve', 'solid-vapour curve', 'liquid-vapour curve')
+
+gas_constant = constants.gas_constant
+
+
+def parameters(diagram):
+    """
+    Numeric data of a phase diagram as floats in SI units
+
+    Antoine parameters are the ones of `PhaseDiagram.antoine_si`, for pressure in pascal and temperature in kelvin.
+
+    Parameters
+    ----------
+    diagram : PhaseDiagram
+
+    Returns
+    -------
+    Parameters
+    """
+    with registry_lock:
+        quantities = (diagram.molar_mass, diagram.density_solid, diagram.density_liquid,
+                      *diagram.antoine_si,
+                      *diagram.boiling_point, *diagram.melting_point, *diagram.triple_point, *diagram.critical_point,
+                      diagram.enthalpy_fusion, diagram.enthalpy_sublimation, diagram.enthalpy_vaporization,
+                      diagram.volume_change_fusion)
+        return Parameters(*(float(value) if unit is None else float(value.m_as(unit))
+                            for value, unit in zip(quantities, _units)))
+
+
+# compound -> (snapshot generation, compound index, Parameters)
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def compound_parameters(compound):
+    """
+    Cached `Parameters` of a compound
+
+    Each entry records the generation of the database snapshot it was built from and is used only while that
+    snapshot is current, so parameters built during a `src.helpers.reload_database` call are never served after it.
+    Entries of compounds not changed by a reload are carried over to the new snapshot.
+
+    Parameters
+    ----------
+    compound : str
+        compound name, formula or CAS
+
+    Returns
+    -------
+    Parameters
+    """
+    entry = _cache.get(compound)
+    if entry is not None and entry[0] == database().generation:
+        return entry[2]
+    with pinned_database() as snapshot, registry_lock:
+        diagram = PhaseDiagram(compound)
+        params = parameters(diagram)
+    with _cache_lock:
+        entry = _cache.get(compound)
+        if entry is None or entry[0] <= snapshot.generation:
+            _cache[compound] = (snapshot.generation, int(diagram.idx), params)
+    return params
+
+
+@on_reload
+def _discard_cached(affected, snapshot):
+    generation = snapshot.generation
+    with _cache_lock:
+        for compound, (entry_generation, idx, params) in list(_cache.items()):
+            if entry_generation == generation:
+                continue
+            if entry_generation == generation - 1 and affected is not None and idx not in affected:
+                _cache[compound] = (generation, idx, params)
+            else:
+                del _cache[compound]
+
+
+def clapeyron_sl(params, temperature):
+    """Clausius-Clapeyron solid-liquid pressures (Pa) for temperatures (K)"""
+    cte = params.enthalpy_fusion / params.volume_change_fusion
+    return params.triple_pressure + cte * np.log(np.asarray(temperature) / params.triple_temperature)
+
+
+def _clapeyron_exp(params, temperature, enthalpy):
+    cte = enthalpy / gas_constant
+    return params.triple_pressure * np.exp(cte * (1 / params.triple_temperature - 1 / np.asarray(temperature)))
+
+
+def clapeyron_sv(params, temperature):
+    """Clausius-Clapeyron solid-vapour pressures (Pa) for temperatures (K)"""
+    return _clapeyron_exp(params, temperature, params.enthalpy_sublimation)
+
+
+def clapeyron_lv(params, temperature):
+    """Clausius-Clapeyron liquid-vapour pressures (Pa) for temperatures (K)"""
+    return _clapeyron_exp(params, temperature, params.enthalpy_vaporization)
+
+
+def antoine_lv(params, temperature):
+    """Antoine liquid-vapour pressures (Pa) for temperatures (K)"""
+    return 10**(params.antoine_A - params.antoine_B / (params.antoine_C + np.asarray(temperature)))
+
+
+def curves(params, number_of_points=100, clapeyron_lv_curve=False, sampling_tolerance=None):
+    """
+    Phase boundary curves, with the same ranges of `PhaseDiagram.curves`
+
+    Parameters
+    ----------
+    params : Parameters
+    number_of_points : int, default=100
+        number of points of each curve
+    clapeyron_lv_curve : bool, default=False
+        if the Clapeyron liquid-vapour curve will be included along the Antoine one
+    sampling_tolerance : float, optional
+        if given, curves are sampled with `src.sampling.adaptive_temperatures` instead of evenly spaced temperatures
+
+    Returns
+    -------
+    dict
+        curve name as key and tuple of arrays (temperature, pressure) as value
+    """
+    def temperatures(start, stop, function):
+        if sampling_tolerance is None:
+            return np.linspace(start, stop, number_of_points)
+        return adaptive_temperatures(partial(function, params), start, stop, tolerance=sampling_tolerance)
+
+    T_triple, T_critical = params.triple_temperature, params.critical_temperature
+    sl_range = -5 if params.volume_change_fusion > 0 else 5
+    T_sl = temperatures(T_triple, T_triple - sl_range, clapeyron_sl)
+    P_sl = clapeyron_sl(params, T_sl)
+    mask = P_sl < params.critical_pressure
+    sv_range = 60 if T_triple - 60 >= 0 else int(abs(T_triple - 60))
+    T_sv = temperatures(T_triple - sv_range, T_triple, clapeyron_sv)
+    T_lv = temperatures(T_triple, T_critical, antoine_lv)
+    result = {'clapeyron_sl': (T_sl[:np.count_nonzero(mask)], P_sl[mask]),
+              'clapeyron_sv': (T_sv, clapeyron_sv(params, T_sv)),
+              'antoine_lv': (T_lv, antoine_lv(params, T_lv))}
+    if clapeyron_lv_curve:
+        T_lv = temperatures(T_triple, T_critical, clapeyron_lv)
+        result['clapeyron_lv'] = (T_lv, clapeyron_lv(params, T_lv))
+    return result
+
+
+def state_codes(params, temperature, pressure, tolerance=0.001, relative_tolerance=0):
+    """
+    Indexes in `STATES` of the physical states of points, following the rules of `PhaseDiagram.physical_state`
+
+    Parameters
+    ----------
+    params : Parameters
+    temperature : array_like
+        temperatures in kelvin
+    pressure : array_like
+        pressures in pascal
+    tolerance : float, default=0.001
+        absolute tolerance, in pascal, to decide if a point is on a curve
+    relative_tolerance : float, default=0
+        tolerance relative to the curve pressure, added to the absolute one
+
+    Returns
+    -------
+    numpy.ndarray
+        integer array with the broadcast shape of temperature and pressure
+    """
+    T, P = np.broadcast_arrays(np.asarray(temperature, dtype=float), np.asarray(pressure, dtype=float))
+    T_triple, P_triple = params.triple_temperature, params.triple_pressure
+    T_critical, P_critical = params.critical_temperature, params.critical_pressure
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        P_lv = antoine_lv(params, T)
+        P_sl = clapeyron_sl(params, T)
+        P_sv = clapeyron_sv(params, T)
+
+    def on_curve(P_curve):
+        return np.isclose(P, P_curve, atol=tolerance, rtol=relative_tolerance)
+
+    if params.volume_change_fusion == 0:
+        last_state = STATES.index('')
+    else:
+        last_state = np.where((T < T_triple) & (P > P_sv), STATES.index('solid'), STATES.index('liquid'))
+    triple_state = 'liquid' if params.volume_change_fusion < 0 else 'solid'
+
+    conditions = [(T == T_triple) & (P < P_triple),
+                  T == T_triple,
+                  (T == T_critical) & (P < P_critical),
+                  T == T_critical,
+                  on_curve(P_lv),
+                  on_curve(P_sl),
+                  on_curve(P_sv),
+                  (T > T_critical) & (P > P_critical),
+                  T > T_critical,
+                  (T > T_triple) & (P < P_lv),
+                  (T < T_triple) & (P < P_sv)]
+    choices = [STATES.index(state) for state in ('vapour', triple_state, 'vapour', 'liquid', 'liquid-vapour curve',
+                                                 'solid-liquid curve', 'solid-vapour curve', 'supercritical fluid',
+                                                 'gas', 'vapour', 'vapour')]
+    return np.select(conditions, choices, default=last_state)
+
+
+def physical_state(params, temperature, pressure, tolerance=0.001, relative_tolerance=0):
+    """
+    Physical states of points, following the rules of `PhaseDiagram.physical_state`
+
+    Parameters are the same of `state_codes`.
+
+    Returns
+    -------
+    numpy.ndarray
+        string array with the broadcast shape of temperature and pressure
+    """
+    codes = state_codes(params, temperature, pressure, tolerance=tolerance, relative_tolerance=relative_tolerance)
+    return np.array(STATES)[codes]
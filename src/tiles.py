@@ -0,0 +1,274 @@
+"""Tile pyramid of a phase diagram for zoomable viewers
+
+The diagram is a square world in (temperature, log10 pressure). At zoom level z it is split in 2**z x 2**z tiles,
+numbered as in web maps: x grows with temperature and y = 0 is the row with the highest pressures. Each tile is
+rendered on request, without matplotlib figures: the physical state of every pixel is classified with
+`overlay_state_codes` and the pixels where the state changes across a phase boundary are drawn as the boundary curves,
+so each boundary follows the curve function of `src.si` that separates its two states.
+
+Example
+-------
+    renderer = TileRenderer(PhaseDiagram('CO2'), cache=DiskCache('tiles'))
+    png = renderer.render(3, 2, 5)
+"""
+import io
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from matplotlib.image import imsave
+
+from src import si
+from src.cache import diagram_key
+
+COLORS = {'': (255, 255, 255, 0),
+          'solid': (166, 206, 227, 255),
+          'liquid': (178, 223, 138, 255),
+          'vapour': (253, 191, 111, 255),
+          'gas': (251, 154, 153, 255),
+          'supercritical fluid': (202, 178, 214, 255),
+          'solid-liquid curve': (31, 120, 180, 255),
+          'solid-vapour curve': (255, 127, 0, 255),
+          'liquid-vapour curve': (51, 160, 44, 255)}
+
+# pairs of neighbouring states separated by a phase boundary, and the curve drawn between them
+BOUNDARIES = {('solid', 'liquid'): 'solid-liquid curve',
+              ('solid', 'vapour'): 'solid-vapour curve',
+              ('liquid', 'vapour'): 'liquid-vapour curve'}
+
+POINT_COLORS = {'triple': (255, 0, 0, 255), 'critical': (128, 0, 128, 255)}
+
+
+def _boundary_table():
+    table = np.full((len(si.STATES), len(si.STATES)), -1)
+    for (first, second), curve in BOUNDARIES.items():
+        table[si.STATES.index(first), si.STATES.index(second)] = si.STATES.index(curve)
+        table[si.STATES.index(second), si.STATES.index(first)] = si.STATES.index(curve)
+    for state in set(BOUNDARIES.values()):
+        table[si.STATES.index(state), :] = si.STATES.index(state)
+    return table
+
+
+_BOUNDARY_TABLE = _boundary_table()
+_PALETTE = np.array([COLORS[state] for state in si.STATES], dtype=np.uint8)
+
+
+def overlay_state_codes(params, temperature, pressure, tolerance=0.001, relative_tolerance=0):
+    """
+    Indexes in `si.STATES` of the states of points, as `si.state_codes` with solid and liquid separated by the
+    Clapeyron solid-liquid curve
+
+    `si.state_codes` tells solid from liquid only by the triple point temperature, which would draw the solid-liquid
+    boundary as a vertical line. Above the triple point pressure, the solid is here on the side of `si.clapeyron_sl`
+    given by the sign of the volume change of fusion.
+
+    Parameters are the same of `si.state_codes`.
+
+    Returns
+    -------
+    numpy.ndarray
+        integer array with the broadcast shape of temperature and pressure
+    """
+    T, P = np.broadcast_arrays(np.asarray(temperature, dtype=float), np.asarray(pressure, dtype=float))
+    codes = si.state_codes(params, T, P, tolerance=tolerance, relative_tolerance=relative_tolerance)
+    if params.volume_change_fusion == 0:
+        return codes
+    solid, liquid = si.STATES.index('solid'), si.STATES.index('liquid')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        solid_side = (P - si.clapeyron_sl(params, T)) * params.volume_change_fusion > 0
+    condensed = ((codes == solid) | (codes == liquid)) & (P >= params.triple_pressure)
+    return np.where(condensed, np.where(solid_side, solid, liquid), codes)
+
+
+def default_extent(params):
+    """
+    Temperature (K) and log10 pressure (Pa) ranges covering the curves and points of `PhaseDiagram.plot`
+
+    Parameters
+    ----------
+    params : si.Parameters
+
+    Returns
+    -------
+    tuple
+        ((T_min, T_max), (log_P_min, log_P_max))
+    """
+    curves = si.curves(params, number_of_points=50)
+    T = np.concatenate([T_arr for T_arr, P_arr in curves.values()] + [[params.critical_temperature]])
+    with np.errstate(divide='ignore'):
+        log_P = np.log10(np.concatenate([P_arr for T_arr, P_arr in curves.values()] + [[params.critical_pressure]]))
+    log_P = log_P[np.isfinite(log_P)]
+    T_margin = 0.1 * (T.max() - T.min())
+    log_P_margin = 0.1 * (log_P.max() - log_P.min())
+    return ((max(T.min() - T_margin, 0.0), T.max() + T_margin),
+            (log_P.min() - log_P_margin, log_P.max() + log_P_margin))
+
+
+class TileRenderer:
+    def __init__(self, diagram, T_range=None, log_P_range=None, tile_size=256, max_zoom=12, line_width=2,
+                 point_radius=5, cache=None, memory_size=256):
+        """
+        Renders the tiles of a phase diagram on request, keeping the most recent ones in memory
+
+        Parameters
+        ----------
+        diagram : PhaseDiagram
+        T_range : tuple, optional
+            (minimum, maximum) temperature in kelvin of the whole diagram. Default from `default_extent`
+        log_P_range : tuple, optional
+            (minimum, maximum) log10 of the pressure in pascal of the whole diagram. Default from `default_extent`
+        tile_size : int, default=256
+            tile width and height in pixels
+        max_zoom : int, default=12
+            highest zoom level
+        line_width : int, default=2
+            boundary width in pixels
+        point_radius : int, default=5
+            radius in pixels of the triple and critical point markers, 0 to hide them
+        cache : DiskCache, optional
+            persistent cache of the PNG tiles, shared between renderers and processes
+        memory_size : int, default=256
+            number of tiles kept in memory
+        """
+        self.diagram = diagram
+        self.params = si.parameters(diagram)
+        extent = default_extent(self.params)
+        self.T_range = tuple(T_range) if T_range is not None else extent[0]
+        self.log_P_range = tuple(log_P_range) if log_P_range is not None else extent[1]
+        self.tile_size = tile_size
+        self.max_zoom = max_zoom
+        self.line_width = line_width
+        self.point_radius = point_radius
+        self.cache = cache
+        self.memory_size = memory_size
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    def tile_bounds(self, z, x, y):
+        """
+        Temperature and log10 pressure ranges of a tile
+
+        Parameters
+        ----------
+        z : int
+            zoom level
+        x : int
+            column, from the lowest temperature
+        y : int
+            row, from the highest pressure
+
+        Returns
+        -------
+        tuple
+            ((T_min, T_max), (log_P_min, log_P_max))
+        """
+        if not 0 <= z <= self.max_zoom or not (0 <= x < 2**z and 0 <= y < 2**z):
+            raise ValueError(f'Tile {z}/{x}/{y} out of range')
+        T_min, T_max = self.T_range
+        log_P_min, log_P_max = self.log_P_range
+        T_step = (T_max - T_min) / 2**z
+        log_P_step = (log_P_max - log_P_min) / 2**z
+        return ((T_min + x * T_step, T_min + (x + 1) * T_step),
+                (log_P_max - (y + 1) * log_P_step, log_P_max - y * log_P_step))
+
+    def _pixel_grid(self, z, x, y, extra=0):
+        (T_min, T_max), (log_P_min, log_P_max) = self.tile_bounds(z, x, y)
+        T_step = (T_max - T_min) / self.tile_size
+        log_P_step = (log_P_max - log_P_min) / self.tile_size
+        # pixel centres; `extra` pixels beyond the tile edges keep boundaries continuous between tiles
+        index = np.arange(-extra, self.tile_size + extra) + 0.5
+        return T_min + index * T_step, log_P_max - index * log_P_step
+
+    def states(self, z, x, y):
+        """
+        Indexes in `si.STATES` of the pixels of a tile, rows from the highest pressure, see `overlay_state_codes`
+
+        Returns
+        -------
+        numpy.ndarray
+            integer array of shape (tile_size, tile_size)
+        """
+        T_arr, log_P_arr = self._pixel_grid(z, x, y)
+        return overlay_state_codes(self.params, T_arr[np.newaxis, :], 10**log_P_arr[:, np.newaxis],
+                                   tolerance=self.diagram.tolerance,
+                                   relative_tolerance=self.diagram.relative_tolerance)
+
+    def image(self, z, x, y):
+        """
+        RGBA pixels of a tile
+
+        Returns
+        -------
+        numpy.ndarray
+            uint8 array of shape (tile_size, tile_size, 4)
+        """
+        width = self.line_width
+        T_arr, log_P_arr = self._pixel_grid(z, x, y, extra=width)
+        codes = overlay_state_codes(self.params, T_arr[np.newaxis, :], 10**log_P_arr[:, np.newaxis],
+                                    tolerance=self.diagram.tolerance,
+                                    relative_tolerance=self.diagram.relative_tolerance)
+
+        # a pixel is on a boundary if a neighbour up to `width` pixels right or down is across a phase boundary
+        size = self.tile_size + width
+        boundary = np.full((size, size), -1)
+        for shift in range(1, width + 1):
+            for neighbour in (codes[shift:size + shift, :size], codes[:size, shift:size + shift]):
+                boundary = np.maximum(boundary, _BOUNDARY_TABLE[codes[:size, :size], neighbour])
+        tile = slice(width, width + self.tile_size)
+        centred = slice(width - width // 2, width - width // 2 + self.tile_size)
+        boundary = boundary[centred, centred]
+        rgba = _PALETTE[np.where(boundary >= 0, boundary, codes[tile, tile])]
+
+        if self.point_radius > 0:
+            pixels = np.arange(self.tile_size)
+            T_step = T_arr[1] - T_arr[0]
+            log_P_step = log_P_arr[0] - log_P_arr[1]
+            for name, color in POINT_COLORS.items():
+                column = (getattr(self.params, f'{name}_temperature') - T_arr[width]) / T_step
+                row = (log_P_arr[width] - np.log10(getattr(self.params, f'{name}_pressure'))) / log_P_step
+                inside = (pixels[np.newaxis, :] - column)**2 + (pixels[:, np.newaxis] - row)**2 <= self.point_radius**2
+                rgba[inside] = color
+        return rgba
+
+    def _key(self, z, x, y):
+        return diagram_key(self.diagram, 'tile', z=z, x=x, y=y, T_range=self.T_range, log_P_range=self.log_P_range,
+                           tile_size=self.tile_size, line_width=self.line_width, point_radius=self.point_radius,
+                           tolerance=self.diagram.tolerance, relative_tolerance=self.diagram.relative_tolerance)
+
+    def render(self, z, x, y):
+        """
+        PNG image of a tile, from the memory or disk cache if it was already rendered
+
+        Parameters
+        ----------
+        z : int
+            zoom level
+        x : int
+            column, from the lowest temperature
+        y : int
+            row, from the highest pressure
+
+        Returns
+        -------
+        bytes
+        """
+        with self._lock:
+            png = self._memory.get((z, x, y))
+            if png is not None:
+                self._memory.move_to_end((z, x, y))
+                return png
+
+        key = self._key(z, x, y) if self.cache is not None else None
+        png = self.cache.get(key) if key is not None else None
+        if png is None:
+            buffer = io.BytesIO()
+            imsave(buffer, self.image(z, x, y), format='png')
+            png = buffer.getvalue()
+            if key is not None:
+                self.cache.set(key, png)
+
+        with self._lock:
+            self._memory[(z, x, y)] = png
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+        return png
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from scipy.optimize import curve_fit
+
+from phase_diagram.phase_diagram import PhaseDiagram
+from src.antoine_fit import fit, COLUMNS
+
+compounds = ['H2O', 'CO2', 'I2']
+antoine = {compound: PhaseDiagram(compound).antoine for compound in compounds}
+
+
+def dataset(noise=0.0, points=12, seed=0):
+    rng = np.random.default_rng(seed)
+    names, T, P = [], [], []
+    for compound, (Tmin, Tmax, A, B, C) in antoine.items():
+        t = np.linspace(Tmin, Tmax, points)
+        names += [compound] * points
+        T.append(t + 273.15)
+        P.append(10**(A - B / (t + C)) * 101325 / 760 * (1 + noise * rng.standard_normal(points)))
+    order = rng.permutation(len(names))
+    return np.array(names)[order], np.concatenate(T)[order], np.concatenate(P)[order]
+
+
+def test_exact_data():
+    result = fit(*dataset(), reference=4)
+    assert list(result.columns[:len(COLUMNS) + 1]) == COLUMNS + ['reference']
+    assert result['id'].tolist() == [1, 2, 3]
+    for compound, row in zip(compounds, result.itertuples()):
+        assert np.allclose((row.t_min, row.t_max, row.A, row.B, row.C), antoine[compound], rtol=1e-6)
+        assert row.points == 12 and row.rmse < 1e-8
+
+
+def test_matches_curve_fit():
+    names, T, P = dataset(noise=0.01, seed=1)
+    result = fit(names, T, P).set_index('id')
+    selected = names == 'CO2'
+    Tmin, Tmax, A, B, C = antoine['CO2']
+    expected, _ = curve_fit(lambda t, a, b, c: a - b / (t + c), T[selected] - 273.15,
+                            np.log10(P[selected] * 760 / 101325), p0=(A, B, C))
+    assert np.allclose(result.loc[2, ['A', 'B', 'C']].astype(float), expected, rtol=1e-4)
+    assert 0.001 < result.loc[2, 'rmse'] < 0.01
+
+
+def test_invalid_data():
+    # log10(P) linear in T (infinite C) cannot be fitted either
+    result = fit([7, 7, 8, 8, 8, 9, 9, 9], [300, 310, 300, 310, 320, 300, 310, 320],
+                 [1e3, 2e3, 1e3, 2e3, 3.5e3, 1e3, 2e3, 4e3])
+    assert result['A'].isna().tolist() == [True, False, True]
+    assert result.loc[1, 'rmse'] < 1e-8
+    with pytest.raises(ValueError):
+        fit([1, 1, 1], [300, 310, 320], [1e3, 0, 2e3])
+
+
+def test_compounds_not_in_database():
+    names, T, P = dataset()
+    names = np.where(names == 'I2', 'new compound', names)
+    result = fit(names, T, P)
+    assert result['compound'].tolist() == ['new compound', 'H2O', 'CO2']
+    assert result['id'].isna().tolist() == [True, False, False]
+    assert np.allclose(result.loc[0, ['t_min', 't_max', 'A', 'B', 'C']].astype(float), antoine['I2'], rtol=1e-6)
+    merged = fit(np.where(names == 'H2O', 'water', names)[:len(names) // 2].tolist() + names[len(names) // 2:].tolist(),
+                 T, P)
+    assert merged['id'].tolist()[1:] == [1, 2] and merged.loc[1, 'points'] == 12
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from phase_diagram.phase_diagram import PhaseDiagram
+from src import batch, si
+
+Q_ = PhaseDiagram('H2O').ureg.Quantity
+
+
+def test_compound_ids():
+    ids = batch.compound_ids(['water', 'CO2', 'H2O', '7732-18-5'])
+    assert ids.tolist() == [1, 2, 1, 1]
+    assert batch.compound_ids([2, 1]).tolist() == [2, 1]
+    with pytest.raises(KeyError):
+        batch.compound_ids(['water', 'unobtainium'])
+
+
+def test_group():
+    groups = batch.group([3, 1, 3, 2, 1])
+    assert groups.ids.tolist() == [1, 2, 3]
+    assert [groups.order[start:stop].tolist() for start, stop in zip(groups.bounds[:-1], groups.bounds[1:])] == \
+        [[1, 4], [3], [0, 2]]
+
+
+def test_physical_state_matches_phase_diagram():
+    rng = np.random.default_rng(1)
+    compounds = np.array(['H2O', 'CO2', 'I2'])[rng.integers(0, 3, 60)]
+    T = rng.uniform(150, 900, 60)
+    P = 10**rng.uniform(1, 8, 60)
+    expected = [PhaseDiagram(compound).physical_state((Q_(t, 'K'), Q_(p, 'Pa')))
+                for compound, t, p in zip(compounds, T, P)]
+    assert batch.physical_state(compounds, T, P).tolist() == expected
+    assert np.array_equal(batch.state_codes(compounds, Q_(T - 273.15, 'degC'), Q_(P / 1e5, 'bar')),
+                          batch.state_codes(compounds, T, P))
+
+
+def test_broadcast():
+    codes = batch.state_codes('water', [250, 300, 400], 1e5)
+    assert [si.STATES[code] for code in codes] == ['solid', 'liquid', 'vapour']
+
+
+def test_compounds_without_full_data():
+    with pytest.raises(ValueError, match='Ar'):
+        batch.physical_state(['water', 'argon'], 300, 1e5)
+    with pytest.raises(ValueError, match='Ar'):
+        batch.compound_id_parameters(int(batch.compound_ids(['argon'])[0]))
@@ -0,0 +1,76 @@
+import os
+
+import numpy as np
+
+from phase_diagram.phase_diagram import PhaseDiagram
+from src.cache import DiskCache, cached_plot, cached_curves
+
+water = PhaseDiagram('water')
+
+
+def test_get_set(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    key = DiskCache.key('water', 1)
+    assert cache.get(key) is None
+    cache.set(key, b'abc')
+    assert key in cache
+    assert cache.get(key) == b'abc'
+    assert not [name for name in os.listdir(tmp_path) if name.startswith('.tmp-')]
+
+
+def test_key_depends_on_parts():
+    assert DiskCache.key('water', {'a': 1, 'b': 2}) == DiskCache.key('water', {'b': 2, 'a': 1})
+    assert DiskCache.key('water', 1) != DiskCache.key('water', 2)
+
+
+def test_lru_eviction(tmp_path):
+    cache = DiskCache(str(tmp_path), max_size=25)
+    for i, key in enumerate(('a', 'b')):
+        cache.set(key, bytes(10))
+        os.utime(cache._path(key), ns=(i, i))
+    cache.get('a')
+    cache.set('c', bytes(10))
+    assert 'a' in cache
+    assert 'b' not in cache
+    assert cache.size <= 25
+
+
+def test_cached_plot(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    image = cached_plot(water, cache, dpi=20)
+    assert image.startswith(b'\x89PNG')
+    assert cached_plot(water, cache, dpi=20) == image
+    assert cache.size == len(image)
+
+
+def test_cached_curves(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    first = cached_curves(water, cache)
+    second = cached_curves(water, cache)
+    assert np.allclose(second['antoine_lv'][1], water.antoine_lv()[1])
+    assert np.allclose(first['clapeyron_sl'][0], second['clapeyron_sl'][0])
+
+
+def test_key_depends_on_diagram_data(tmp_path):
+    from src import si
+    from src.cache import diagram_key
+    params = si.parameters(water)._replace(triple_pressure=700.0)
+    modified = PhaseDiagram.from_parameters(params, water.idx, water.name, water.formula, water.cas)
+    assert diagram_key(modified, 'curves') != diagram_key(water, 'curves')
+    cache = DiskCache(str(tmp_path))
+    cached_curves(water, cache)
+    assert np.isclose(cached_curves(modified, cache)['clapeyron_sv'][1][-1].magnitude, 700.0)
+
+
+def test_pickled_diagram_hits_cache(tmp_path):
+    import pickle
+    from src.cache import diagram_key
+    from src.shared import SharedDatabase
+    cache = DiskCache(str(tmp_path))
+    cached_curves(water, cache)
+    copy = pickle.loads(pickle.dumps(pickle.loads(pickle.dumps(water))))
+    assert diagram_key(copy, 'curves') == diagram_key(water, 'curves')
+    with SharedDatabase.create() as database:
+        assert diagram_key(database.phase_diagram('water'), 'curves') == diagram_key(water, 'curves')
+    cached_curves(copy, cache)
+    assert len(os.listdir(tmp_path)) == 1
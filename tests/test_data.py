@@ -1,5 +1,5 @@
 from phase_diagram.phase_diagram import PhaseDiagram
-from src.helpers import compound_index, state_index
+from src.helpers import compound_index, state_index, full_data_compounds
 import pint
 import numpy as np
 
@@ -85,3 +85,9 @@ def test_compound_index():
     assert compound_index('water') == 1
     assert compound_index('CO2') == 2
     assert compound_index('iodine') == 3
+
+
+def test_full_data_compounds():
+    ids = full_data_compounds()
+    assert ids[:2] == [1, 2]
+    assert 18 not in ids  # argon has no solid density
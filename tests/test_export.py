@@ -0,0 +1,50 @@
+import io
+import json
+
+import numpy as np
+
+from phase_diagram.phase_diagram import PhaseDiagram
+from src.export import round_significant, decimate, diagram_data, to_json, to_npz, read_npz, write_json_lines
+
+water = PhaseDiagram('water')
+
+
+def test_round_significant():
+    assert np.array_equal(round_significant([611.657, 2.206e7, 0.000165123], 3), [612, 2.21e7, 0.000165])
+
+
+def test_decimate_keeps_last_point():
+    assert np.array_equal(decimate(np.arange(10), 4), [0, 4, 8, 9])
+
+
+def test_diagram_data_curves_match_plot_curves():
+    data = diagram_data(water)
+    assert set(data['curves']) == {'clapeyron_sl', 'clapeyron_sv', 'antoine_lv'}
+    T_arr, P_arr = water.antoine_lv()
+    assert np.allclose(data['curves']['antoine_lv']['pressure'], P_arr.magnitude)
+    assert np.all(data['curves']['clapeyron_sl']['pressure'] < water.critical_point.pressure.magnitude)
+
+
+def test_diagram_data_units():
+    data = diagram_data(water, T_unit='degC', P_unit='bar')
+    assert np.allclose(data['points']['triple_point'], (0.01, 0.00611657))
+
+
+def test_to_json():
+    data = json.loads(to_json(water, precision=4, step=10))
+    assert data['compound']['formula'] == 'H2O'
+    assert len(data['curves']['antoine_lv']['temperature']) == 11
+    assert data['points']['critical_point'] == [647.1, 2.206e7]
+
+
+def test_npz_round_trip():
+    data = read_npz(to_npz(water, dtype='float64'))
+    assert data['compound']['cas'] == '7732-18-5'
+    assert np.allclose(data['curves']['clapeyron_sv']['pressure'], water.clapeyron_sv()[1].magnitude)
+
+
+def test_write_json_lines():
+    stream = io.StringIO()
+    assert write_json_lines(['water', water, 'CO2'], stream) == 3
+    lines = stream.getvalue().splitlines()
+    assert json.loads(lines[2])['compound']['name'] == 'carbon dioxide'
@@ -0,0 +1,60 @@
+import numpy as np
+
+from phase_diagram.phase_diagram import PhaseDiagram
+from src import si
+from src.intersections import intersections, consistent_parameters, compound_intersections, stack
+
+# the mercury Antoine and solid-vapour curves only cross far below the Antoine validity range
+compounds = ['H2O', 'N2', 'Hg']
+params = [si.compound_parameters(compound) for compound in compounds]
+
+
+def test_curves_meet():
+    result = intersections(params)
+    for name in ('clapeyron_sv', 'clapeyron_sl'):
+        T, P = getattr(result, name)
+        assert T.shape == (3,) and np.all(np.isfinite(T[:2]))
+        # the solid-liquid curve is steep, so small temperature errors give larger pressure ones
+        assert np.allclose(getattr(si, name)(stack(params[:2]), T[:2]), P[:2], rtol=1e-5)
+        assert np.allclose(si.antoine_lv(stack(params[:2]), T[:2]), P[:2], rtol=1e-9)
+    T, P = intersections(params, max_shift=np.inf).clapeyron_lv
+    assert np.allclose(si.clapeyron_lv(stack(params[:2]), T[:2]), P[:2], rtol=1e-9)
+
+
+def test_valid_range():
+    T_sv = intersections(params).clapeyron_sv.temperature
+    assert np.isclose(T_sv[0], 273.85, atol=0.01)
+    # the water curves cross again near 330 K, and the mercury ones near 95 K
+    assert np.isnan(T_sv[2])
+    T_sv = intersections(params, max_shift=np.inf).clapeyron_sv.temperature
+    assert np.isclose(T_sv[0], 273.85, atol=0.01) and np.isnan(T_sv[2])
+    assert np.isnan(intersections(params[0], max_shift=0.5).clapeyron_sv.temperature[0])
+    for T, p in zip(T_sv[:2], params):
+        assert p.antoine_Tmin <= T <= p.antoine_Tmax
+
+
+def test_consistent_parameters():
+    consistent = consistent_parameters(params[1])
+    assert isinstance(consistent, si.Parameters)
+    T, P = consistent.triple_temperature, consistent.triple_pressure
+    assert T != params[1].triple_temperature
+    for curve in (si.clapeyron_sl, si.clapeyron_sv, si.clapeyron_lv, si.antoine_lv):
+        assert np.isclose(curve(consistent, T), P, rtol=1e-6)
+    assert consistent_parameters(params)[2] == params[2]
+
+
+def test_phase_diagram_and_table():
+    T, P, found = PhaseDiagram('N2').consistent_triple_point()
+    table = compound_intersections(compounds)
+    assert table.index.tolist() == [1, 237, 178]
+    assert found and table.loc[237, 'clapeyron_sv_found']
+    assert np.isclose(table.loc[237, 'clapeyron_sv_temperature'], T.to('K').magnitude)
+    assert np.isclose(table.loc[237, 'clapeyron_sv_pressure'], P.to('Pa').magnitude)
+    assert np.isclose(table.loc[237, 'clapeyron_sv_shift'], T.to('K').magnitude - params[1].triple_temperature)
+
+    mercury = PhaseDiagram('Hg')
+    T, P, found = mercury.consistent_triple_point()
+    assert not found and not table.loc[178, 'clapeyron_sv_found']
+    assert (T, P) == tuple(mercury.triple_point)
+    assert table.loc[178, 'clapeyron_sv_temperature'] == params[2].triple_temperature
+    assert np.isnan(table.loc[178, 'clapeyron_sv_shift'])
@@ -1,5 +1,10 @@
 from phase_diagram.phase_diagram import PhaseDiagram
 import numpy as np
+import matplotlib
+import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection, PathCollection
+
+matplotlib.use('Agg')
 
 
 def test_water_clapeyron_antoine_array_methods():
@@ -34,3 +39,15 @@ def test_water_antoine_si():
 def test_water_formula():
     water = PhaseDiagram('water')
     assert water.format_formula() == r'$\mathregular{H_2O}$'
+
+
+def test_plot_overlay_single_collections():
+    fig, ax = plt.subplots()
+    PhaseDiagram.plot_overlay(['water', PhaseDiagram('CO2')], ax=ax, clapeyron_lv=True)
+    assert not ax.lines
+    assert len(ax.collections) == 2
+    lines, points = ax.collections
+    assert isinstance(lines, LineCollection) and len(lines.get_segments()) == 8
+    assert isinstance(points, PathCollection) and len(points.get_offsets()) == 4
+    assert len(ax.get_legend().get_texts()) == 2
+    plt.close(fig)
@@ -65,3 +65,8 @@ def test_point_water_07():
 
 def test_point_water_08():
     assert not point_in_function((Q_('270 K'),Q_('44150144.529 Pa')), water._clapeyron_sl)
+
+
+def test_point_in_straight_line_function_relative_tolerance():
+    assert point_in_function((Q_('3000 m'), Q_('3000.2 m')), straight_line_y, tolerance=0, relative_tolerance=1e-4)
+    assert not point_in_function((Q_('3000 m'), Q_('3000.4 m')), straight_line_y, tolerance=0, relative_tolerance=1e-4)
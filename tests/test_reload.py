@@ -0,0 +1,110 @@
+import shutil
+import threading
+import sqlite3
+
+import pytest
+
+from phase_diagram.phase_diagram import PhaseDiagram
+from src import helpers, si
+
+
+@pytest.fixture
+def database_copy(tmp_path, monkeypatch):
+    path = str(tmp_path / 'data.db')
+    shutil.copy(helpers.DB, path)
+    original = helpers.database()
+    monkeypatch.setattr(helpers, 'DB', path)
+    helpers.reload_database(force=True)
+    yield path
+    monkeypatch.undo()
+    helpers.reload_database(force=True)
+    assert helpers.database()['triple_point'].equals(original['triple_point'])
+
+
+def test_reload_unchanged(database_copy):
+    snapshot = helpers.database()
+    assert helpers.reload_database() == set()
+    assert helpers.reload_database(force=True) == set()
+    assert helpers.database() is snapshot
+
+
+def test_reload_changed_compound(database_copy):
+    si.compound_parameters('CO2')
+    snapshot = helpers.database()
+    with sqlite3.connect(database_copy) as conn:
+        conn.execute("UPDATE triple_point SET pressure = 520000 WHERE id = 2")
+    assert helpers.reload_database(force=True) == {2}
+    assert helpers.database()['antoine'] is snapshot['antoine']
+    assert helpers.database().lookup is snapshot.lookup
+    assert PhaseDiagram('CO2').triple_point.pressure.magnitude == 520000
+    assert si.compound_parameters('CO2').triple_pressure == 520000
+
+
+def test_reload_new_compound(database_copy):
+    with sqlite3.connect(database_copy) as conn:
+        conn.execute("INSERT INTO compounds VALUES (514, '0000-00-0', 'Xx', 1.0, 514)")
+        conn.execute("INSERT INTO names VALUES (514, 'examplium', NULL, NULL, NULL)")
+    assert helpers.reload_database(force=True) == {514}
+    assert helpers.compound_index('examplium') == 514
+
+
+def test_pinned_database(database_copy):
+    with helpers.pinned_database() as snapshot:
+        with sqlite3.connect(database_copy) as conn:
+            conn.execute("UPDATE critical_point SET pressure = 1 WHERE id = 1")
+        helpers.reload_database(force=True)
+        assert helpers.database() is snapshot
+    assert helpers.database() is not snapshot
+
+
+def test_stale_parameters_not_served(database_copy):
+    with helpers.pinned_database():
+        with sqlite3.connect(database_copy) as conn:
+            conn.execute("UPDATE triple_point SET pressure = 520000 WHERE id = 2")
+        helpers.reload_database(force=True)
+        # built from the old snapshot after the reload discarded the cached entries
+        assert si.compound_parameters('CO2').triple_pressure == 518500
+    assert si.compound_parameters('CO2').triple_pressure == 520000
+
+
+def test_unaffected_parameters_kept(database_copy):
+    water = si.compound_parameters('H2O')
+    with sqlite3.connect(database_copy) as conn:
+        conn.execute("UPDATE triple_point SET pressure = 520000 WHERE id = 2")
+    helpers.reload_database(force=True)
+    assert si.compound_parameters('H2O') is water
+
+
+def test_unaffected_parameters_kept_when_pinned(database_copy):
+    water = si.compound_parameters('H2O')
+    with helpers.pinned_database():
+        with sqlite3.connect(database_copy) as conn:
+            conn.execute("UPDATE triple_point SET pressure = 520000 WHERE id = 2")
+        helpers.reload_database(force=True)
+    assert si.compound_parameters('H2O') is water
+    assert si.compound_parameters('CO2').triple_pressure == 520000
+
+
+def test_readers_not_blocked_by_reload(database_copy, monkeypatch):
+    snapshot = helpers.database()
+    reading, release = threading.Event(), threading.Event()
+    read_tables = helpers._read_tables
+
+    def slow_read_tables(conn, table_names):
+        reading.set()
+        release.wait(5)
+        return read_tables(conn, table_names)
+
+    monkeypatch.setattr(helpers, '_read_tables', slow_read_tables)
+    with sqlite3.connect(database_copy) as conn:
+        conn.execute("UPDATE critical_point SET pressure = 1 WHERE id = 1")
+    thread = threading.Thread(target=helpers.reload_database, kwargs={'force': True})
+    thread.start()
+    try:
+        assert reading.wait(5)
+        assert helpers.database() is snapshot
+        assert helpers.compound_index('water') == 1
+    finally:
+        release.set()
+        thread.join()
+    assert helpers.database() is not snapshot
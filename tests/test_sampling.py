@@ -0,0 +1,39 @@
+import numpy as np
+
+from phase_diagram.phase_diagram import PhaseDiagram
+from src import si
+from src.sampling import adaptive_temperatures
+
+
+def test_straight_line_in_log_space_needs_no_refinement():
+    T_arr = adaptive_temperatures(lambda T: 10**T, 1, 10, tolerance=1e-6, initial_points=3)
+    assert np.array_equal(T_arr, [1, 5.5, 10])
+
+
+def test_decreasing_range_and_endpoints():
+    T_arr = adaptive_temperatures(lambda T: np.exp(-1000 / T), 300, 100, tolerance=0.01)
+    assert T_arr[0] == 300 and T_arr[-1] == 100
+    assert np.all(np.diff(T_arr) < 0)
+
+
+def test_tolerance_is_met():
+    def function(T):
+        return 611.657 - 3.8e9 * np.log(T / 273.16)
+
+    T_arr = adaptive_temperatures(function, 273.16, 268.16, tolerance=0.01)
+    T_dense = np.linspace(273.16, 268.16, 100001)
+    order = np.argsort(T_arr)
+    interpolated = np.interp(T_dense, T_arr[order], np.log10(function(T_arr[order])))
+    assert np.max(np.abs(interpolated - np.log10(function(T_dense)))) < 0.02
+    assert len(T_arr) < 100
+
+
+def test_phase_diagram_adaptive_curves():
+    water = PhaseDiagram('water', sampling_tolerance=0.01)
+    T_arr, P_arr = water.clapeyron_sl()
+    assert len(T_arr) < water.number_of_points
+    assert T_arr[0] == water.triple_point.temperature
+    assert np.allclose(P_arr, water._clapeyron_sl(T_arr))
+    expected = si.curves(si.compound_parameters('water'), sampling_tolerance=0.01)
+    for name, (T_arr, P_arr) in water.curves().items():
+        assert np.allclose(T_arr.magnitude, expected[name][0])
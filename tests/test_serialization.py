@@ -0,0 +1,77 @@
+import math
+import pickle
+import struct
+
+import numpy as np
+import pytest
+
+from phase_diagram.phase_diagram import PhaseDiagram
+from src import si
+from src.serialization import dumps, loads, MAGIC
+
+co2 = PhaseDiagram('CO2', number_of_points=50, tolerance=0.01, sampling_tolerance=0.05)
+
+
+class SubPhaseDiagram(PhaseDiagram):
+    pass
+
+
+def test_round_trip():
+    copy = PhaseDiagram.from_bytes(co2.to_bytes())
+    assert np.allclose(si.parameters(copy), si.parameters(co2))
+    assert (copy.idx, copy.name, copy.formula, copy.cas) == (co2.idx, co2.name, co2.formula, co2.cas)
+    assert (copy.number_of_points, copy.tolerance, copy.sampling_tolerance) == (50, 0.01, 0.05)
+    Q_ = co2.ureg.Quantity
+    for point in [(Q_(250, 'K'), Q_(1e6, 'Pa')), (Q_(300, 'K'), Q_(1e5, 'Pa')), (Q_(350, 'K'), Q_(1e7, 'Pa'))]:
+        assert copy.physical_state(point) == co2.physical_state(point)
+
+
+def test_pickle():
+    data = pickle.dumps(co2)
+    copy = pickle.loads(data)
+    assert len(data) < 450
+    for name, (T_arr, P_arr) in copy.curves().items():
+        assert np.allclose(P_arr.magnitude, co2.curves()[name][1].magnitude)
+
+
+def test_missing_names():
+    water = loads(dumps(PhaseDiagram('H2O')))
+    assert water.sampling_tolerance is None and water.density_table is None
+    assert math.isnan(water.alternative_names[0]) and water.alternative_names[1:] == (None, None)
+
+
+def test_invalid_data():
+    data = bytearray(co2.to_bytes())
+    with pytest.raises(ValueError):
+        loads(b'XXXX' + bytes(data[4:]))
+    data[4] = 99
+    with pytest.raises(ValueError):
+        loads(bytes(data))
+
+
+def test_lossless_pickle():
+    for diagram in (PhaseDiagram('H2O'), co2, SubPhaseDiagram('CO2')):
+        copy = pickle.loads(pickle.dumps(diagram))
+        assert type(copy) is type(diagram)
+        assert copy.compound == diagram.compound
+        assert copy.antoine == diagram.antoine
+        assert [name if isinstance(name, str) else repr(name) for name in copy.alternative_names] == \
+            [name if isinstance(name, str) else repr(name) for name in diagram.alternative_names]
+
+
+def test_exact_parameters():
+    for diagram in (PhaseDiagram('H2O'), co2, PhaseDiagram('I2')):
+        params = si.parameters(diagram)
+        copy = pickle.loads(pickle.dumps(pickle.loads(pickle.dumps(diagram))))
+        assert si.parameters(copy) == params
+        assert si.parameters(PhaseDiagram.from_parameters(params, diagram.idx, diagram.name, diagram.formula,
+                                                          diagram.cas)) == params
+
+
+def test_schema_version_1():
+    body = struct.pack(f'<q{len(si.FIELDS)}dqddd', 2, *si.parameters(co2), 100, 0.001, 0, math.nan)
+    strings = b''.join(struct.pack('<H', len(text)) + text.encode()
+                       for text in (co2.name, co2.formula, co2.cas)) + struct.pack('<HHH', 0xFFFF, 0xFFFF, 0xFFFF)
+    copy = loads(struct.pack('<4sB', MAGIC, 1) + body + strings)
+    assert copy.compound == co2.name and copy.sampling_tolerance is None
+    assert np.allclose(copy.antoine, co2.antoine)
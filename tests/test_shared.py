@@ -0,0 +1,51 @@
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from phase_diagram.phase_diagram import PhaseDiagram
+from src import si
+from src.shared import SharedDatabase
+
+
+def worker_state(name, compound):
+    with SharedDatabase.attach(name) as database:
+        diagram = database.phase_diagram(compound)
+        return diagram.physical_state((diagram.ureg.Quantity(250, 'K'), diagram.ureg.Quantity(1e3, 'Pa')))
+
+
+@pytest.fixture(scope='module')
+def shared_database():
+    with SharedDatabase.create() as database:
+        yield database
+
+
+def test_parameters(shared_database):
+    assert shared_database.parameters('carbonic anhydride') == si.parameters(PhaseDiagram('CO2'))
+
+
+def test_parameters_read_only(shared_database):
+    with pytest.raises(ValueError):
+        shared_database.parameters_array[0, 0] = 0
+
+
+def test_phase_diagram(shared_database):
+    water = PhaseDiagram('water')
+    shared_water = shared_database.phase_diagram('7732-18-5', number_of_points=50)
+    assert (shared_water.idx, shared_water.name, shared_water.formula) == (1, 'water', 'H2O')
+    assert shared_water.triple_point == water.triple_point
+    assert np.isclose(shared_water.volume_change_fusion, water.volume_change_fusion)
+    assert np.allclose(shared_water.antoine, water.antoine)
+    assert np.allclose(shared_water.antoine_lv()[1], PhaseDiagram('water', number_of_points=50).antoine_lv()[1])
+    assert shared_water.density_table is None and len(water.density_table) == 4
+
+
+def test_unknown_compound(shared_database):
+    with pytest.raises(KeyError):
+        shared_database.row('argon')
+
+
+def test_attach_in_workers(shared_database):
+    with multiprocessing.Pool(2) as pool:
+        states = pool.starmap(worker_state, [(shared_database.name, 'water'), (shared_database.name, 'CO2')])
+    assert states == ['solid', 'vapour']
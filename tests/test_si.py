@@ -0,0 +1,46 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from phase_diagram.phase_diagram import PhaseDiagram
+from src import si
+
+water = PhaseDiagram('H2O')
+water_params = si.compound_parameters('H2O')
+Q_ = water.ureg.Quantity
+
+
+def test_parameters_si_units():
+    assert np.isclose(water_params.molar_mass, 0.0180153)
+    assert np.isclose(water_params.density_solid, 916.7)
+    assert np.isclose(water_params.enthalpy_fusion, 6009)
+    assert np.isclose(water_params.volume_change_fusion, -1.583e-6, atol=1e-9)
+    assert water_params.triple_temperature == 273.16
+    assert water_params.antoine_A == water.antoine_si.A
+
+
+def test_compound_parameters_cached():
+    assert si.compound_parameters('H2O') is si.compound_parameters('H2O')
+
+
+def test_curves_match_phase_diagram():
+    expected = water.curves(clapeyron_lv=True)
+    for name, (T_arr, P_arr) in si.curves(water_params, clapeyron_lv_curve=True).items():
+        assert np.allclose(T_arr, expected[name][0].magnitude)
+        assert np.allclose(P_arr, expected[name][1].to('Pa').magnitude)
+
+
+def test_physical_state_matches_phase_diagram():
+    T = np.array([700, 700, 500, 250, 250, 400, 273.16, 273.16, 647.1, 400])
+    P = np.array([1e8, 1e5, 1e5, 1e1, 1e3, 1e7, 100, 1e5, 1e8, 246493.814])
+    expected = [water.physical_state((Q_(t, 'K'), Q_(p, 'Pa'))) for t, p in zip(T, P)]
+    assert list(si.physical_state(water_params, T, P)) == expected
+
+
+def test_physical_state_in_threads():
+    rng = np.random.default_rng(0)
+    chunks = [(rng.uniform(200, 800, 1000), 10**rng.uniform(-2, 9, 1000)) for _ in range(16)]
+    expected = [si.state_codes(water_params, T, P) for T, P in chunks]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda chunk: si.state_codes(water_params, *chunk), chunks))
+    assert all(np.array_equal(result, codes) for result, codes in zip(results, expected))
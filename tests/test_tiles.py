@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from phase_diagram.phase_diagram import PhaseDiagram
+from src import si
+from src.cache import DiskCache
+from src.tiles import TileRenderer, COLORS, overlay_state_codes
+
+water = PhaseDiagram('H2O')
+renderer = TileRenderer(water, tile_size=64)
+
+
+def test_tile_bounds():
+    (T_min, T_max), (log_P_min, log_P_max) = renderer.tile_bounds(0, 0, 0)
+    assert np.allclose((T_min, T_max), renderer.T_range) and np.allclose((log_P_min, log_P_max), renderer.log_P_range)
+    assert T_min < water.triple_point.temperature.magnitude < water.critical_point.temperature.magnitude < T_max
+    assert np.allclose(renderer.tile_bounds(1, 1, 0), (((T_min + T_max) / 2, T_max),
+                                                       ((log_P_min + log_P_max) / 2, log_P_max)))
+    with pytest.raises(ValueError):
+        renderer.tile_bounds(1, 2, 0)
+
+
+def test_states_and_image():
+    (T_min, T_max), (log_P_min, log_P_max) = renderer.tile_bounds(2, 1, 2)
+    T = T_min + (np.arange(64) + 0.5) * (T_max - T_min) / 64
+    P = 10**(log_P_max - (np.arange(64) + 0.5) * (log_P_max - log_P_min) / 64)
+    states = renderer.states(2, 1, 2)
+    assert np.array_equal(states, overlay_state_codes(si.parameters(water), T[np.newaxis, :], P[:, np.newaxis]))
+
+    image = renderer.image(0, 0, 0)
+    assert image.shape == (64, 64, 4) and image.dtype == np.uint8
+    colors = {tuple(color) for color in image.reshape(-1, 4)}
+    for state in ('solid', 'liquid', 'vapour', 'solid-liquid curve', 'solid-vapour curve', 'liquid-vapour curve'):
+        assert COLORS[state] in colors
+
+
+def test_solid_liquid_boundary():
+    co2 = PhaseDiagram('CO2')
+    params = si.parameters(co2)
+    zoom = TileRenderer(co2, T_range=(212, 222), log_P_range=(5, 7.2), tile_size=128, line_width=1, point_radius=0)
+    states = zoom.states(0, 0, 0)
+    on_curve = np.all(zoom.image(0, 0, 0) == COLORS['solid-liquid curve'], axis=2)
+    T, log_P = zoom._pixel_grid(0, 0, 0)
+    solid, liquid = si.STATES.index('solid'), si.STATES.index('liquid')
+    for row in np.flatnonzero(10**log_P > params.triple_pressure * 1.1):
+        # temperature of the Clapeyron solid-liquid curve at the pressure of the row
+        T_sl = params.triple_temperature * np.exp((10**log_P[row] - params.triple_pressure)
+                                                  * params.volume_change_fusion / params.enthalpy_fusion)
+        assert np.isclose(si.clapeyron_sl(params, T_sl), 10**log_P[row])
+        (column,) = np.flatnonzero((states[row, :-1] == solid) & (states[row, 1:] == liquid))
+        assert T[column] <= T_sl <= T[column + 1]
+        assert on_curve[row, column] or on_curve[row, column + 1]
+    assert not on_curve[10**log_P < params.triple_pressure * 0.9].any()
+
+
+def test_render_cached(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    png = TileRenderer(water, tile_size=64, cache=cache).render(1, 0, 1)
+    assert png.startswith(b'\x89PNG')
+    assert len(list(tmp_path.iterdir())) == 1
+    other = TileRenderer(water, tile_size=64, cache=cache, memory_size=1)
+    assert other.render(1, 0, 1) == png
+    assert other.render(1, 0, 1) is other.render(1, 0, 1)
+    other.render(1, 1, 1)
+    assert list(other._memory) == [(1, 1, 1)]